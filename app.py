@@ -1,83 +1,257 @@
+import time
+IMPORT_STARTED = time.perf_counter()
+
 import discord
 from discord.ext import commands , tasks 
 import os
-import traceback
-from flask import Flask
-import threading
+import asyncio
+import logging
 import sys
-import aiohttp
 
 from dotenv import load_dotenv
 
+# Antes de importar utils/: sus módulos leen la configuración del entorno al importarse.
+if os.path.exists(".env"):
+    load_dotenv()
 
-app = Flask(__name__)
-bot_name = "None"
-
-
-
-@app.route('/')
-def home():
-    return f"Bot {bot_name} is active"
-
-
-def run_flask():
-    port = int(os.environ.get("PORT", 10000))
-    if os.name == 'nt':
-        from waitress import serve
-        serve(app, host="0.0.0.0", port=port)
-    else:
-        app.run(host='0.0.0.0', port=port)
-
+from utils.cooldowns import CooldownStore
+from utils.guild_settings import GUILD_STORE, GuildDatabase
+from utils.http import UpstreamClient
+from utils.log import setup_logging
+from utils.memory import MemoryReporter, freeze_heap, rss_bytes, tune_gc
+from utils.metrics import LoopLagMonitor, command_latency, command_total, metrics
+from utils.quotas import QuotaEngine
+from utils.runtime import install_event_loop, runtime_profile
+from utils.startup import sync_if_changed
+from utils.status import StatusServer
+from utils.tracing import LoopBlockDetector, tracer
 
-flask_thread = threading.Thread(target=run_flask, daemon=True)
-flask_thread.start()
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
 
-if os.path.exists(".env"):
-    load_dotenv()
+log = logging.getLogger("seemu")
 
 TOKEN = os.getenv("TOKEN")
 if not TOKEN:
     raise ValueError("TOKEN not found in environment variables")
 
+# Modo ligero: solo los intents y cachés que usan los cogs (para miles de servidores).
+LEAN_MODE = os.getenv("BOT_LEAN_MODE", "0") == "1"
+LEAN_MESSAGE_CONTENT = os.getenv("LEAN_MESSAGE_CONTENT", "1") == "1"
+LEAN_MAX_MESSAGES = int(os.getenv("LEAN_MAX_MESSAGES", 100))
+
+# Los fija launcher.py para cada proceso del clúster; sin ellos discord.py decide los shards.
+CLUSTER_ID = int(os.getenv("CLUSTER_ID", 0))
+SHARD_COUNT = os.getenv("SHARD_COUNT")
+SHARD_IDS = os.getenv("SHARD_IDS")
+
 extensions = [
     "cogs.likeCommands",
     "cogs.infoCommands"
 ]
 
 
-class Seemu(commands.Bot):
+def shard_options():
+    options = {}
+    if SHARD_COUNT:
+        options["shard_count"] = int(SHARD_COUNT)
+    if SHARD_IDS:
+        options["shard_ids"] = [int(shard_id) for shard_id in SHARD_IDS.split(",")]
+    return options
+
+
+def bot_options():
+    if not LEAN_MODE:
+        return {"command_prefix": "!", "intents": discord.Intents.all(), **shard_options()}
+
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.guild_messages = True
+    options = {
+        "intents": intents,
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+        "chunk_guilds_at_startup": False,
+        "max_messages": LEAN_MAX_MESSAGES or None,
+        **shard_options(),
+    }
+    if LEAN_MESSAGE_CONTENT:
+        intents.message_content = True
+        options["command_prefix"] = "!"
+    else:
+        # Sin message content Discord solo envía el texto de los mensajes que mencionan al bot.
+        log.warning("Lean mode without message content: prefix commands only work as '@Bot <command>'")
+        options["command_prefix"] = commands.when_mentioned
+    return options
+
+
+class Seemu(commands.AutoShardedBot):
     def __init__(self, command_prefix: str, intents: discord.Intents, **kwargs):
         super().__init__(command_prefix=command_prefix, intents=intents, **kwargs)
-        self.session = None
+        self.started_at = time.perf_counter()
+        self.startup_phases = {"import": IMPORT_SECONDS}
+        self.upstream = UpstreamClient()
+        self.cooldowns = CooldownStore()
+        self.quotas = QuotaEngine()
+        self.config_stores = [self.quotas.store]
+        self.job_queues = []
+        self.guild_db = None
+        self.loop_lag = LoopLagMonitor()
+        self.memory = MemoryReporter()
+        self.loop_blocks = LoopBlockDetector()
+        self.status_server = StatusServer(self)
+        self.required_extensions = extensions
+        self.cluster_id = CLUSTER_ID
         self.initialized = False
+        self.before_invoke(self._start_command_timer)
+        self.after_invoke(self._finish_command_timer)
+        self._register_metrics()
+
+    def _register_metrics(self):
+        metrics.gauge("bot_gateway_latency_seconds", "Discord gateway heartbeat latency.", callback=lambda: self.latency)
+        metrics.gauge("bot_guilds", "Guilds the bot is in.", callback=lambda: len(self.guilds))
+        metrics.gauge("bot_event_loop_lag_seconds", "Last measured event-loop lag.", callback=lambda: self.loop_lag.lag)
+        metrics.gauge("bot_process_rss_bytes", "Resident set size at the last memory sample.", callback=lambda: self.memory.rss)
+        metrics.gauge("bot_gc_objects", "Objects tracked by the GC at the last memory sample.", callback=lambda: self.memory.objects)
+        metrics.gauge("bot_gc_collections", "GC collections per generation.", ("generation",), callback=self.memory.gc_collections)
+        metrics.gauge(
+            "bot_startup_phase_seconds", "Duration of each startup phase.", ("phase",),
+            callback=lambda: dict(self.startup_phases),
+        )
+        metrics.gauge("bot_cooldowns_active", "Active user cooldowns.", callback=lambda: len(self.cooldowns))
+        metrics.gauge(
+            "bot_quota_requests", "Requests counted against guild daily quotas in the current period.", ("command",),
+            callback=lambda: self.quotas.stats()["requests"],
+        )
+        metrics.gauge(
+            "bot_like_queue_jobs", "Like jobs by state (pending in the queue, running on a worker).", ("state",),
+            callback=lambda: {"pending": self._like_queue_stats()["pending"], "running": self._like_queue_stats()["busy"]},
+        )
+        metrics.gauge(
+            "bot_like_queue_utilization", "Fraction of like queue workers busy.",
+            callback=lambda: self._like_queue_stats()["utilization"],
+        )
+        metrics.gauge(
+            "bot_upstream_pool_connections", "Upstream connection pool by state.", ("state",),
+            callback=self.upstream.pool_stats,
+        )
+        metrics.gauge(
+            "bot_upstream_breaker_open", "1 while a host's circuit breaker is not closed.", ("host",),
+            callback=lambda: {host: int(stats["state"] != "closed") for host, stats in self.upstream.breaker_stats().items()},
+        )
+        metrics.gauge(
+            "bot_upstream_budget_remaining", "Requests left in a host's token bucket.", ("host",),
+            callback=lambda: {host: stats["remaining"] for host, stats in self.upstream.governor.stats().items()},
+        )
+        metrics.gauge(
+            "bot_upstream_rejections", "Requests refused by the quota governor (local) or the host (throttled).", ("host", "kind"),
+            callback=lambda: {
+                (host, kind): stats[kind]
+                for host, stats in self.upstream.governor.stats().items()
+                for kind in ("rejected", "throttled")
+            },
+        )
+        metrics.gauge(
+            "bot_upstream_coalesced", "Requests that joined an identical in-flight request.", ("endpoint",),
+            callback=lambda: {endpoint: stats["coalesced"] for endpoint, stats in self.upstream.coalesce_stats().items()},
+        )
+        metrics.gauge(
+            "bot_info_cache", "Player-info cache counters and size.", ("stat",),
+            callback=lambda: self.get_cog("InfoCommands").info_cache.stats() if self.get_cog("InfoCommands") else {},
+        )
+        metrics.gauge(
+            "bot_info_latency_seconds",
+            "/info latency from the player lookup to the last reply (image included), over the last 1024 calls.",
+            ("quantile",),
+            callback=lambda: self.get_cog("InfoCommands").latency.summary() if self.get_cog("InfoCommands") else {},
+        )
+
+    def _like_queue_stats(self):
+        cog = self.get_cog("LikeCommands")
+        if cog is None or cog.queue is None:
+            return {"pending": None, "busy": None, "utilization": None}
+        return cog.queue.stats()
+
+    async def _start_command_timer(self, ctx):
+        ctx.started_at = time.perf_counter()
+        ctx.trace = tracer.start(ctx.command.qualified_name)
+
+    async def _finish_command_timer(self, ctx):
+        self._record_command(ctx, "error" if ctx.command_failed else "ok")
+
+    def _record_command(self, ctx, outcome):
+        if ctx.command is None:
+            return
+        started = getattr(ctx, "started_at", None)
+        if started is False:
+            return
+        ctx.started_at = False
+        trace = getattr(ctx, "trace", None)
+        if trace is not None:
+            tracer.finish(trace, outcome)
+        name = ctx.command.qualified_name
+        command_total.inc(name, outcome)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        command_latency.observe(elapsed, name)
+        log.info("Command finished", extra={
+            "command": name,
+            "guild": ctx.guild.id if ctx.guild else None,
+            "uid": trace.key if trace is not None else None,
+            "latency_ms": round(elapsed * 1000, 1),
+            "status": outcome,
+        })
 
     async def setup_hook(self) -> None:
-        self.session = aiohttp.ClientSession()
-
-        for ext in extensions:
-            try:
-                await self.load_extension(ext)
-                print(f"✅ {ext} loaded successfully")
-            except Exception as e:
-                print(f"❌ Failed to load {ext}: {e}")
-                traceback.print_exc()
-
-        await self.tree.sync()
-        print("✔ All cogs loaded")
+        await self.upstream.start()
+        self.loop_lag.start()
+        self.loop_blocks.start()
+        if GUILD_STORE == "sqlite":
+            self.guild_db = GuildDatabase()
+            self.guild_db.start_sync()
+
+        phase_started = time.perf_counter()
+        await asyncio.gather(*(self._load(ext) for ext in extensions))
+        self.startup_phases["cog_load"] = time.perf_counter() - phase_started
+        log.info("All cogs loaded")
+
+        phase_started = time.perf_counter()
+        # Solo el clúster 0 sincroniza: el árbol de comandos es global para la aplicación.
+        if self.cluster_id == 0 and await sync_if_changed(self.tree, self.application_id):
+            log.info("Command tree synced")
+        else:
+            log.info("Command tree unchanged, sync skipped")
+        self.startup_phases["tree_sync"] = time.perf_counter() - phase_started
+        self._setup_finished = time.perf_counter()
         self.initialized = True
         self.update_activity_task.start()
+        await self.status_server.start()
+        # Lo creado al arrancar (cogs, comandos, módulos) no vuelve a recorrerse en cada colección.
+        freeze_heap()
+        self.memory.start()
+
+    async def _load(self, ext):
+        try:
+            await self.load_extension(ext)
+            log.info("%s loaded successfully", ext)
+        except Exception as e:
+            log.exception("Failed to load %s: %s", ext, e)
 
     async def on_ready(self):
-        global bot_name
         if not self.initialized:
             return
 
         server_count = len(self.guilds) #
         activity = discord.Game(name=f"Sharing likes on {server_count} servers")
         await self.change_presence(activity=activity)
-        bot_name = f"{self.user}"
-        print(f"\n🔗 Connected as {bot_name}")
-        print(f"🌐 Flask running on port {os.environ.get('PORT', 10000)}\n")
+        log.info("Connected as %s", self.user)
+        log.info("Status server running on port %s", self.status_server.port)
+        if "gateway_ready" not in self.startup_phases:
+            self.startup_phases["gateway_ready"] = time.perf_counter() - self._setup_finished
+            phases = " | ".join(f"{phase} {seconds:.2f}s" for phase, seconds in self.startup_phases.items())
+            rss = rss_bytes()
+            rss_text = f"{rss / 1024 / 1024:.1f} MB" if rss is not None else "?"
+            mode = "lean" if LEAN_MODE else "full"
+            log.info("Startup: %s | RSS %s | %s mode", phases, rss_text, mode)
 
     @tasks.loop(minutes=5) 
     
@@ -87,11 +261,10 @@ class Seemu(commands.Bot):
             server_count = len(self.guilds)  # Number of servers the bot is in
             activity = discord.Game(name=f"Sharing likes on {server_count} servers!!")
             await self.change_presence(activity=activity)
-            print(f"Activity updated: Sharing likes on {server_count} servers")
+            log.debug("Activity updated: Sharing likes on %d servers", server_count)
 
         except Exception as e:
-            print(f"⚠️ Error while updating activity: {e}")
-            traceback.print_exc()
+            log.exception("Error while updating activity: %s", e)
 
 
 
@@ -99,10 +272,19 @@ class Seemu(commands.Bot):
     async def before_update_activity_task(self):
        
         await self.wait_until_ready()
-        print("Bot ready, starting activity update loop.")
+        log.info("Bot ready, starting activity update loop.")
     async def close(self):
-        if self.session:
-            await self.session.close()
+        # Primero las colas: los trabajos en curso aún necesitan la sesión HTTP y la conexión a Discord.
+        await asyncio.gather(*(queue.close() for queue in self.job_queues))
+        self.loop_lag.stop()
+        self.loop_blocks.stop()
+        self.memory.stop()
+        await self.status_server.stop()
+        await asyncio.gather(*(store.close() for store in self.config_stores))
+        if self.guild_db is not None:
+            self.guild_db.stop_sync()
+            await asyncio.get_running_loop().run_in_executor(None, self.guild_db.close)
+        await self.upstream.close()
         await super().close()
 
     
@@ -110,6 +292,7 @@ class Seemu(commands.Bot):
     @commands.Cog.listener()
     async def on_command_error(self, ctx, error):
         """Global error handler for all commands"""
+        self._record_command(ctx, "error")
         if isinstance(error, commands.MissingPermissions):
             try:
                 msg = "❌ You need to be an administrator to use this command."
@@ -128,23 +311,33 @@ class Seemu(commands.Bot):
         elif isinstance(error, commands.CommandNotFound):
             return
 
-        print(f"Unhandled error: {error}")
-        traceback.print_exc()
+        log.error("Unhandled error: %s", error, exc_info=error, extra={
+            "command": ctx.command.qualified_name if ctx.command else None,
+            "guild": ctx.guild.id if ctx.guild else None,
+        })
         await ctx.send("⚠️ An unexpected error occurred. [1214]", ephemeral=True)
 
 
-if __name__ == "__main__":
+def main():
+    setup_logging()
+    install_event_loop()
+    profile = runtime_profile()
+    log.info("Runtime: %s event loop, %s decoder", profile["event_loop"], profile["json"])
     try:
-        intents = discord.Intents.all()
-        bot = Seemu(command_prefix="!", intents=intents)
-        bot.run(TOKEN)
+        tune_gc()
+        bot = Seemu(**bot_options())
+        # Sin handler propio: los logs de discord.py pasan por la misma cola que los del bot.
+        bot.run(TOKEN, log_handler=None)
     except discord.errors.LoginFailure:
-        print("❌ Invalid Discord token")
+        log.error("Invalid Discord token")
         sys.exit(1)
     except KeyboardInterrupt:
-        print("\n🛑 Stopping bot...")
+        log.info("Stopping bot...")
         sys.exit(0)
     except Exception as e:
-        print(f"⚠️ Unexpected error: {e}")
-        traceback.print_exc()
+        log.exception("Unexpected error: %s", e)
         sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
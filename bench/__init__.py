@@ -0,0 +1 @@
+"""Offline benchmark harness: local upstream mocks and a fake Discord context for the cogs."""
@@ -0,0 +1,114 @@
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import discord
+
+BENCH_GUILD_ID = 100000000000000001
+BENCH_CHANNEL_ID = 100000000000000002
+BENCH_APPLICATION_ID = 100000000000000003
+
+_user_ids = itertools.count(200000000000000001)
+
+
+class FakeMessage:
+    def __init__(self, kwargs):
+        self.kwargs = kwargs
+        self.edits = 0
+
+    async def edit(self, **kwargs):
+        self.edits += 1
+        self.kwargs.update(kwargs)
+
+
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeContext:
+    """Just enough of ``commands.Context`` to drive a cog command without Discord."""
+
+    def __init__(self, guild_id=BENCH_GUILD_ID, channel_id=BENCH_CHANNEL_ID, user_id=None, slash=False):
+        # Un usuario distinto por invocación: el enfriamiento por usuario no frena el benchmark.
+        user_id = next(_user_ids) if user_id is None else user_id
+        # Como comando de barra, los trabajos de la cola responden por el webhook de la interacción.
+        self.interaction = (
+            SimpleNamespace(application_id=BENCH_APPLICATION_ID, token=f"bench-token-{user_id}") if slash else None
+        )
+        self.guild = SimpleNamespace(id=guild_id, get_channel=lambda channel_id: None)
+        self.channel = SimpleNamespace(id=channel_id)
+        self.author = SimpleNamespace(
+            id=user_id, mention=f"<@{user_id}>",
+            display_avatar=SimpleNamespace(url=f"https://cdn.discordapp.com/embed/avatars/{user_id % 5}.png"),
+        )
+        self.message = SimpleNamespace(attachments=[])
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        kwargs["content"] = content
+        message = FakeMessage(kwargs)
+        self.sent.append(message)
+        await asyncio.sleep(0)
+        return message
+
+    async def reply(self, content=None, **kwargs):
+        return await self.send(content, **kwargs)
+
+    async def defer(self, **kwargs):
+        pass
+
+    def typing(self):
+        return _Typing()
+
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        kwargs["content"] = content
+        message = FakeMessage(kwargs)
+        self.sent.append(message)
+        return message
+
+
+class FakeConnectionState:
+    """The parts of discord.py's ``ConnectionState`` a follow-up webhook uses."""
+
+    def __init__(self, session):
+        self.http = SimpleNamespace(_HTTPClient__session=session, proxy=None, proxy_auth=None, token=None)
+
+    def store_user(self, data, *, cache=True):
+        return discord.user.BaseUser(state=self, data=data)
+
+    def _get_guild(self, guild_id):
+        return None
+
+
+class FakeBot:
+    """The attributes the cogs read from ``Seemu``, backed by the real shared services."""
+
+    def __init__(self, upstream, cooldowns, quotas, session=None):
+        self.upstream = upstream
+        self._connection = FakeConnectionState(session)
+        self.channels = {}
+        self.cooldowns = cooldowns
+        self.quotas = quotas
+        self.config_stores = [quotas.store]
+        self.job_queues = []
+        self.guild_db = None
+        self.cogs = {}
+
+    def get_cog(self, name):
+        return self.cogs.get(name)
+
+    def get_channel(self, channel_id):
+        return None
+
+    def get_partial_messageable(self, channel_id, guild_id=None):
+        return self.channels.setdefault(channel_id, FakeChannel(channel_id))
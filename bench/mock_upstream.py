@@ -0,0 +1,180 @@
+import argparse
+import asyncio
+import json
+import math
+import random
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+
+from aiohttp import web
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+@dataclass
+class MockConfig:
+    latency: float = 0.05
+    jitter: float = 0.02
+    error_rate: float = 0.0
+    not_found_rate: float = 0.0
+    info_bytes: int = 8192
+    image_bytes: int = 200_000
+    seed: int = 0
+
+
+def player_info(uid, padding):
+    now = int(time.time())
+    return {
+        "basicInfo": {
+            "nickname": f"Bench{uid[-4:]}", "level": 70, "exp": 3_000_000, "region": "BR",
+            "liked": 12345, "releaseVersion": "OB48", "badgeCnt": 12, "showBrRank": True,
+            "rankingPoints": 4200, "showCsRank": True, "csRankingPoints": 80,
+            "createAt": now - 3 * 365 * 86400, "lastLoginAt": now - 3600, "bannerId": 901000001,
+        },
+        "captainBasicInfo": {
+            "nickname": "Leader", "accountId": "123456789", "level": 75, "exp": 5_000_000,
+            "lastLoginAt": now - 7200, "title": 904090001, "badgeCnt": 30, "showBrRank": True,
+            "rankingPoints": 5000, "showCsRank": True, "csRankingPoints": 100, "pinId": 910000001,
+        },
+        "clanBasicInfo": {"clanName": "BenchClan", "clanId": "3000000001", "clanLevel": 5, "memberNum": 40, "capacity": 50},
+        "creditScoreInfo": {"creditScore": 100},
+        "petInfo": {"name": "Pet", "level": 7, "exp": 6000, "isSelected": True, "skinId": 1300000001},
+        "profileInfo": {"avatarId": 902000001, "equipedSkills": [16, 1, 2, 3]},
+        "socialInfo": {"signature": "bench"},
+        # Listas que la API real devuelve y el bot descarta; dan a la respuesta el tamaño
+        # y la forma (muchos objetos pequeños) de un perfil real.
+        "equippedItems": equipped_items(padding),
+    }
+
+
+def equipped_items(size):
+    """Item records totalling roughly ``size`` bytes of JSON."""
+    items, total = [], 0
+    while total < size:
+        i = len(items)
+        item = {
+            "itemId": 203000000 + i * 37, "type": ("weapon", "outfit", "emote", "vehicle")[i % 4],
+            "level": i % 7 + 1, "isSelected": i % 5 == 0, "expireTime": 0,
+            "attributes": [{"key": key, "value": (i * key) % 100} for key in (1, 2, 3)],
+        }
+        items.append(item)
+        # Tamaño aproximado de cada objeto serializado.
+        total += 190
+    return items
+
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def png_image(size, seed=0):
+    """A valid RGB PNG of roughly ``size`` bytes (noise, so it barely compresses)."""
+    side = max(1, int(math.sqrt(size / 3)))
+    rng = random.Random(seed)
+    rows = b"".join(b"\x00" + rng.randbytes(side * 3) for _ in range(side))
+    header = struct.pack(">IIBBBBB", side, side, 8, 2, 0, 0, 0)
+    return (
+        PNG_SIGNATURE + _png_chunk(b"IHDR", header)
+        + _png_chunk(b"IDAT", zlib.compress(rows, 1)) + _png_chunk(b"IEND", b"")
+    )
+
+
+EPHEMERAL_FLAG = 1 << 6
+
+
+def webhook_message(application_id, body):
+    """The message object Discord returns for ``POST /webhooks/{application_id}/{token}?wait=true``."""
+    return {
+        "id": "300000000000000001", "channel_id": "100000000000000002", "type": 0, "webhook_id": application_id,
+        "content": body.get("content", ""), "embeds": body.get("embeds", []), "flags": body.get("flags", 0),
+        "author": {"id": application_id, "username": "Seemu", "discriminator": "0000", "avatar": None, "bot": True},
+        "attachments": [], "mentions": [], "mention_roles": [], "mention_everyone": False, "pinned": False,
+        "tts": False, "timestamp": "2026-01-01T00:00:00+00:00", "edited_timestamp": None,
+    }
+
+
+def discord_json(payload):
+    # discord.py solo decodifica la respuesta si Content-Type es exactamente application/json (sin charset).
+    return web.Response(body=json.dumps(payload).encode(), headers={"Content-Type": "application/json"})
+
+
+def create_app(config):
+    rng = random.Random(config.seed)
+    image = png_image(config.image_bytes, config.seed)
+    counters = {"like": 0, "info": 0, "generate": 0, "followup": 0, "followup_ephemeral": 0}
+
+    async def respond(request, endpoint):
+        counters[endpoint] += 1
+        await asyncio.sleep(max(0.0, rng.gauss(config.latency, config.jitter)))
+        roll = rng.random()
+        if roll < config.error_rate:
+            return web.Response(status=500, text="mock error")
+        if roll < config.error_rate + config.not_found_rate:
+            return web.Response(status=404, text="not found")
+        return None
+
+    async def like(request):
+        failure = await respond(request, "like")
+        if failure is not None:
+            return failure
+        uid = request.query.get("uid", "0")
+        return web.json_response({
+            "status": 1, "nickname": f"Bench{uid[-4:]}", "region": "BR",
+            "likes_added": 100, "likes_before": 12345, "likes_after": 12445,
+        })
+
+    async def info(request):
+        failure = await respond(request, "info")
+        if failure is not None:
+            return failure
+        return web.json_response(player_info(request.query.get("uid", "0"), config.info_bytes))
+
+    async def generate(request):
+        failure = await respond(request, "generate")
+        if failure is not None:
+            return failure
+        return web.Response(body=image, content_type="image/png")
+
+    async def followup(request):
+        # Ejecutar el webhook de una interacción (los mensajes de los trabajos de la cola de /like).
+        body = await request.json()
+        counters["followup"] += 1
+        if body.get("flags", 0) & EPHEMERAL_FLAG:
+            counters["followup_ephemeral"] += 1
+        return discord_json(webhook_message(request.match_info["application_id"], body))
+
+    async def stats(request):
+        return web.json_response(counters)
+
+    app = web.Application()
+    app.router.add_get("/like", like)
+    app.router.add_get("/info", info)
+    app.router.add_get("/generate", generate)
+    app.router.add_get("/stats", stats)
+    app.router.add_post("/discord/webhooks/{application_id}/{token}", followup)
+    return app
+
+
+def serve(config, host="127.0.0.1", port=8765):
+    web.run_app(create_app(config), host=host, port=port, access_log=None, print=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the like/info/generate APIs.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=MockConfig.latency)
+    parser.add_argument("--jitter", type=float, default=MockConfig.jitter)
+    parser.add_argument("--error-rate", type=float, default=MockConfig.error_rate)
+    parser.add_argument("--not-found-rate", type=float, default=MockConfig.not_found_rate)
+    parser.add_argument("--info-bytes", type=int, default=MockConfig.info_bytes)
+    parser.add_argument("--image-bytes", type=int, default=MockConfig.image_bytes)
+    args = parser.parse_args()
+    config = MockConfig(args.latency, args.jitter, args.error_rate, args.not_found_rate, args.info_bytes, args.image_bytes)
+    print(f"Mock upstream on http://127.0.0.1:{args.port} (/like, /info, /generate)")
+    serve(config, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
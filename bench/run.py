@@ -0,0 +1,358 @@
+"""Drive the cogs against a local upstream mock and write machine-readable results.
+
+    python -m bench.run --requests 500 --concurrency 50 --output bench-results.json
+    python -m bench.run --baseline bench-results.json   # exits 1 on a regression
+    python -m bench.run --commands like --like-queue --error-rate 0.05 --not-found-rate 0.05
+
+Comparing the fast runtime profile (uvloop + orjson) against the stdlib one:
+
+    python -m bench.run --commands info --output bench-stdlib.json
+    FAST_RUNTIME=1 python -m bench.run --commands info --baseline bench-stdlib.json --output bench-fast.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+import discord
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.fakes import BENCH_GUILD_ID, FakeBot, FakeContext
+from bench.mock_upstream import MockConfig, serve
+from utils.latency import LatencyRecorder
+from utils.log import setup_logging
+from utils.memory import rss_bytes
+from utils.metrics import LoopLagMonitor, image_optimize_bytes, image_optimize_total, job_total
+from utils.runtime import install_event_loop, runtime_profile
+from utils.tracing import tracer
+
+COMMANDS = ("like", "info")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), timeout=0.2):
+            return
+        time.sleep(0.05)
+    raise RuntimeError(f"Mock upstream did not start on port {port}")
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return rss_bytes()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KiB, macOS en bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def build_bot(workdir):
+    from cogs.infoCommands import InfoCommands
+    from cogs.likeCommands import LikeCommands
+    from utils.cooldowns import CooldownStore
+    from utils.http import UpstreamClient
+    from utils.quotas import QuotaEngine
+
+    upstream = UpstreamClient()
+    await upstream.start()
+    # El servidor del benchmark está suscrito: la cuota diaria no limita las mediciones.
+    quotas = QuotaEngine(os.path.join(workdir, "guild_quotas.json"), subscribed={BENCH_GUILD_ID})
+    # Sesión de los webhooks de seguimiento (los trabajos de la cola de /like), como la del cliente de discord.py.
+    bot = FakeBot(upstream, CooldownStore(), quotas, session=aiohttp.ClientSession())
+    bot.cogs["LikeCommands"] = LikeCommands(bot)
+    bot.cogs["InfoCommands"] = InfoCommands(bot)
+    for cog in bot.cogs.values():
+        await cog.cog_load()
+    return bot
+
+
+async def close_bot(bot):
+    for cog in bot.cogs.values():
+        await cog.cog_unload()
+    await asyncio.gather(*(store.close() for store in bot.config_stores))
+    await bot.upstream.close()
+    await bot._connection.http._HTTPClient__session.close()
+
+
+def invoker(bot, command):
+    if command == "like":
+        cog = bot.cogs["LikeCommands"]
+        return lambda ctx, uid: cog.like_command.callback(cog, ctx, uid)
+    cog = bot.cogs["InfoCommands"]
+    return lambda ctx, uid: cog.player_info.callback(cog, ctx, uid)
+
+
+async def mock_stats(bot, mock_url):
+    async with bot._connection.http._HTTPClient__session.get(f"{mock_url}/stats") as response:
+        return await response.json()
+
+
+async def drain(queue):
+    while queue.stats()["pending"] or queue.busy:
+        await asyncio.sleep(0.01)
+
+
+async def run_command(bot, command, requests, concurrency, uid_pool, mock_url):
+    invoke = invoker(bot, command)
+    # Con la cola, /like solo encola: la latencia medida es la del acuse y el tiempo total incluye vaciarla.
+    queue = bot.cogs["LikeCommands"].queue if command == "like" else None
+    if queue is not None:
+        before = await mock_stats(bot, mock_url)
+        failed_before = job_total.values.get(("like", "failed"), 0)
+    recorder = LatencyRecorder(size=requests)
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+    lag = LoopLagMonitor(interval=0.01)
+
+    async def one(i):
+        nonlocal errors
+        uid = str(10_000_000 + (i % uid_pool if uid_pool else i))
+        ctx = FakeContext(slash=queue is not None)
+        async with semaphore:
+            started = time.perf_counter()
+            trace = tracer.start(command)
+            try:
+                await invoke(ctx, uid)
+                tracer.finish(trace, "ok")
+            except Exception:
+                errors += 1
+                tracer.finish(trace, "error")
+            recorder.record(time.perf_counter() - started)
+        # Los comandos responden los fallos en mensajes efímeros (el acuse de la cola también lo es).
+        if queue is None and any(message.kwargs.get("ephemeral") for message in ctx.sent):
+            errors += 1
+
+    lag.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    if queue is not None:
+        await drain(queue)
+    elapsed = time.perf_counter() - started
+    lag.stop()
+    queued = None
+    if queue is not None:
+        after = await mock_stats(bot, mock_url)
+        # Los 404 y 5xx llegan como seguimientos efímeros; un trabajo fallido no respondió nada.
+        queued = {
+            "jobs_failed": job_total.values.get(("like", "failed"), 0) - failed_before,
+            "followups": after["followup"] - before["followup"],
+            "ephemeral_followups": after["followup_ephemeral"] - before["followup_ephemeral"],
+            "channel_fallbacks": sum(len(channel.sent) for channel in bot.channels.values()),
+        }
+        errors += queued["jobs_failed"] + queued["ephemeral_followups"]
+    result = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "duration_s": round(elapsed, 4),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            name: round(recorder.percentile(p) * 1000, 2) for name, p in (("p50", 50), ("p95", 95), ("p99", 99))
+        },
+        "loop_lag_max_ms": round(lag.max_lag * 1000, 2),
+        "slowest": tracer.slowest(3, command),
+        "rss_bytes": rss_bytes(),
+    }
+    if queued is not None:
+        result["queue"] = queued
+    return result
+
+
+async def run(args, workdir):
+    bot = await build_bot(workdir)
+    results = {}
+    try:
+        for command in args.commands:
+            # Calentamiento: abre conexiones del pool antes de medir.
+            await run_command(
+                bot, command, min(args.concurrency, args.requests), args.concurrency, args.uid_pool, args.mock_url
+            )
+            results[command] = await run_command(
+                bot, command, args.requests, args.concurrency, args.uid_pool, args.mock_url
+            )
+            results[command]["coalesce"] = bot.upstream.coalesce_stats().get(command)
+        info = bot.cogs["InfoCommands"]
+        if "info" in results and info.image_cache is not None:
+            results["info"]["image_cache"] = info.image_cache.stats()
+        if "info" in results and info.optimizer is not None:
+            results["info"]["image_optimize"] = {
+                "outcomes": {labels[0]: value for labels, value in image_optimize_total.values.items()},
+                "bytes": {labels[0]: value for labels, value in image_optimize_bytes.values.items()},
+            }
+    finally:
+        await close_bot(bot)
+    return results
+
+
+def differences(results, baseline):
+    """One line per command with the relative change of throughput and latency vs. the baseline."""
+    lines = []
+    for command, current in results["results"].items():
+        previous = baseline.get("results", {}).get(command)
+        if previous is None:
+            continue
+        changes = [f"throughput {_change(previous['throughput_rps'], current['throughput_rps'])}"]
+        changes += [
+            f"{name} {_change(previous['latency_ms'][name], current['latency_ms'][name])}" for name in ("p50", "p95", "p99")
+        ]
+        lines.append(f"{command:<5} vs baseline: " + " | ".join(changes))
+    return lines
+
+
+def _change(before, after):
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for command, current in results["results"].items():
+        previous = baseline.get("results", {}).get(command)
+        if previous is None:
+            continue
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{command}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} rps")
+        if current["latency_ms"]["p95"] > previous["latency_ms"]["p95"] * (1 + tolerance):
+            regressions.append(f"{command}: p95 {previous['latency_ms']['p95']} -> {current['latency_ms']['p95']} ms")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark for the /like and /info commands.")
+    parser.add_argument("--commands", nargs="+", choices=COMMANDS, default=list(COMMANDS))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--uid-pool", type=int, default=0, help="Reuse this many UIDs (0 = every request unique)")
+    parser.add_argument("--latency", type=float, default=MockConfig.latency, help="Mock upstream mean latency (s)")
+    parser.add_argument("--jitter", type=float, default=MockConfig.jitter)
+    parser.add_argument("--error-rate", type=float, default=MockConfig.error_rate)
+    parser.add_argument("--not-found-rate", type=float, default=MockConfig.not_found_rate)
+    parser.add_argument("--info-bytes", type=int, default=MockConfig.info_bytes)
+    parser.add_argument("--image-bytes", type=int, default=MockConfig.image_bytes)
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression vs. the baseline")
+    parser.add_argument(
+        "--like-queue", action="store_true",
+        help="Send /like through the job queue and deliver results as interaction follow-ups (the production default)",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Keep the cogs' log output")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.verbose:
+        setup_logging()
+    else:
+        logging.disable(logging.CRITICAL)
+    config = MockConfig(
+        args.latency, args.jitter, args.error_rate, args.not_found_rate, args.info_bytes, args.image_bytes
+    )
+    port = free_port()
+    mock = multiprocessing.Process(target=serve, args=(config,), kwargs={"port": port}, daemon=True)
+    mock.start()
+    output = os.path.abspath(args.output)
+    cwd = os.getcwd()
+    try:
+        wait_for_port(port)
+        base = f"http://127.0.0.1:{port}"
+        os.environ.update({
+            "LIKE_API_HOSTS": base,
+            "INFO_API_URLS": f"{base}/info",
+            "GENERATE_API_URLS": f"{base}/generate",
+        })
+        args.mock_url = base
+        if args.like_queue:
+            os.environ["LIKE_QUEUE"] = "1"
+            # Los seguimientos de los trabajos van al mock en vez de a la API de Discord.
+            discord.http.Route.BASE = f"{base}/discord"
+        else:
+            # Se mide el camino síncrono de /like; con la cola el comando solo encola.
+            os.environ.setdefault("LIKE_QUEUE", "0")
+        with tempfile.TemporaryDirectory() as workdir:
+            # Los cogs leen y escriben sus JSON de configuración en el directorio actual.
+            os.chdir(workdir)
+            install_event_loop()
+            results = asyncio.run(run(args, workdir))
+            os.chdir(cwd)
+    finally:
+        os.chdir(cwd)
+        mock.terminate()
+        mock.join()
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runtime": runtime_profile(),
+        "mock": vars(config),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for command, result in results.items():
+        latency = result["latency_ms"]
+        print(
+            f"{command:<5} {result['throughput_rps']:>8} rps | p50 {latency['p50']} ms | p95 {latency['p95']} ms | "
+            f"p99 {latency['p99']} ms | lag max {result['loop_lag_max_ms']} ms | errors {result['errors']}"
+        )
+        if "queue" in result:
+            queued = result["queue"]
+            print(
+                f"{'':<5} queue: {queued['followups']} follow-ups ({queued['ephemeral_followups']} ephemeral) | "
+                f"{queued['channel_fallbacks']} channel fallbacks | {queued['jobs_failed']} jobs failed"
+            )
+    profile = report["runtime"]
+    print(f"Peak RSS {report['peak_rss_bytes'] / 1024 / 1024:.1f} MB | {profile['event_loop']} + {profile['json']} -> {output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        for line in differences(report, baseline):
+            print(line)
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,107 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiohttp
 from datetime import datetime
 import json
+import logging
 import os
 import asyncio
+import contextvars
 import io
 import uuid
-import gc
+import time
 from datetime import datetime
 
+from utils.cache import TTLCache, STALE
+from utils.guild_settings import JsonGuildSettings
+from utils.http import hosts_from_env
+from utils.image_cache import DiskImageCache
+from utils.imaging import create_optimizer, image_extension
+from utils.latency import LatencyRecorder
+from utils.metrics import channel_rejections, cooldown_rejections, quota_rejections
+from utils.persistence import JsonStore
+from utils.runtime import loads
+from utils.singleflight import SingleFlight
+from utils.tracing import tracer
+
+log = logging.getLogger(__name__)
+
 CONFIG_FILE = "info_channels.json"
+INFO_CACHE_TTL = int(os.getenv("INFO_CACHE_TTL", 60))
+INFO_CACHE_STALE = int(os.getenv("INFO_CACHE_STALE", 300))
+INFO_CACHE_MAX_ENTRIES = int(os.getenv("INFO_CACHE_MAX_ENTRIES", 512))
+INFO_CACHE_MAX_BYTES = int(os.getenv("INFO_CACHE_MAX_BYTES", 4 * 1024 * 1024))
+# INFO_PARALLEL_IMAGE=0 vuelve al flujo secuencial (útil para comparar latencias).
+INFO_PARALLEL_IMAGE = os.getenv("INFO_PARALLEL_IMAGE", "1") != "0"
+IMAGE_DEADLINE = float(os.getenv("INFO_IMAGE_DEADLINE", 20))
+INFO_IMAGE_CACHE = os.getenv("INFO_IMAGE_CACHE", "1") != "0"
+
+# Secciones del JSON de la API que usa el embed; el resto no se guarda en caché.
+INFO_SECTIONS = (
+    "basicInfo", "captainBasicInfo", "clanBasicInfo", "creditScoreInfo",
+    "petInfo", "profileInfo", "socialInfo",
+)
 
 
 class InfoCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.api_url = "https://glob-info2.vercel.app/info"
-        self.generate_url = "https://genprofile2.vercel.app/generate"
-        self.session = aiohttp.ClientSession()
+        self.api_urls = hosts_from_env("INFO_API_URLS", "https://glob-info2.vercel.app/info")
+        self.generate_urls = hosts_from_env("GENERATE_API_URLS", "https://genprofile2.vercel.app/generate")
+        self.upstream = bot.upstream
         self.config_data = self.load_config()
-        self.cooldowns = {}
+        self.config_store = JsonStore(CONFIG_FILE, self.config_data, ensure_ascii=False)
+        bot.config_stores.append(self.config_store)
+        if bot.guild_db is not None:
+            self.guild_settings = bot.guild_db.settings("info")
+        else:
+            self.guild_settings = JsonGuildSettings(
+                "info", self.config_store, "info_channels", ("config", "cooldown"), ("config", "daily_limit")
+            )
+        self.cooldowns = bot.cooldowns
+        self.quotas = bot.quotas
+        self.info_cache = TTLCache(
+            ttl=INFO_CACHE_TTL,
+            stale_ttl=INFO_CACHE_STALE,
+            max_entries=INFO_CACHE_MAX_ENTRIES,
+            max_bytes=INFO_CACHE_MAX_BYTES,
+        )
+        self._refreshing = {}
+        self.latency = LatencyRecorder()
+        self.image_cache = DiskImageCache() if INFO_IMAGE_CACHE else None
+        if self.image_cache is not None:
+            bot.config_stores.append(self.image_cache.store)
+        self.optimizer = create_optimizer()
+        self._image_flight = SingleFlight()
 
     def convert_unix_timestamp(self ,timestamp: int) -> str:
         return datetime.utcfromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
 
-    def check_request_limit(self, guild_id):
-        try:
-            return self.is_server_subscribed(guild_id) or not self.is_limit_reached(guild_id)
-        except Exception as e:
-            print(f"Error al verificar el límite de solicitudes: {e}")
-            return False
+    async def fetch_player_info(self, uid):
+        status, data = await self.upstream.fetch("info", [f"{url}?uid={uid}" for url in self.api_urls], uid)
+        if status == 200:
+            data = {section: data[section] for section in INFO_SECTIONS if section in data}
+            self.info_cache.set(uid, data)
+        return status, data
+
+    async def get_player_info(self, uid):
+        data, state = self.info_cache.get(uid)
+        if data is None:
+            return await self.fetch_player_info(uid)
+        if state == STALE and uid not in self._refreshing:
+            # El refresco sigue tras responder: sin la traza del comando, que ya estará cerrada.
+            task = asyncio.create_task(self.fetch_player_info(uid), context=contextvars.Context())
+            self._refreshing[uid] = task
+            task.add_done_callback(lambda t: self._refresh_done(uid, t))
+        return 200, data
+
+    def _refresh_done(self, uid, task):
+        self._refreshing.pop(uid, None)
+        if not task.cancelled() and task.exception() is not None:
+            log.warning("Error al refrescar la información: %s", task.exception(), extra={"command": "info", "uid": uid})
+
+    def daily_limit_for(self, guild_id):
+        return self.guild_settings.daily_limit(guild_id, self.config_data["global_settings"]["default_daily_limit"])
 
     def load_config(self):
         default_config = {
@@ -46,7 +116,7 @@ class InfoCommands(commands.Cog):
         if os.path.exists(CONFIG_FILE):
             try:
                 with open(CONFIG_FILE, 'r') as f:
-                    loaded_config = json.load(f)
+                    loaded_config = loads(f.read())
                     loaded_config.setdefault("global_settings", {})
                     loaded_config["global_settings"].setdefault("default_all_channels", False)
                     loaded_config["global_settings"].setdefault("default_cooldown", 30)
@@ -54,41 +124,26 @@ class InfoCommands(commands.Cog):
                     loaded_config.setdefault("servers", {})
                     return loaded_config
             except (json.JSONDecodeError, IOError) as e:
-                print(f"Error al cargar la configuración: {e}")
+                log.warning("Error al cargar la configuración: %s", e)
                 return default_config
         return default_config
 
     def save_config(self):
-        try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.config_data, f, indent=4, ensure_ascii=False)
-        except IOError as e:
-            print(f"Error al guardar la configuración: {e}")
+        self.config_store.save()
 
     async def is_channel_allowed(self, ctx):
         try:
-            guild_id = str(ctx.guild.id)
-            allowed_channels = self.config_data["servers"].get(guild_id, {}).get("info_channels", [])
-
-            # Permitir todos los canales si no se ha configurado ninguno para este servidor
-            if not allowed_channels:
-                return True
-
-            # De lo contrario, verificar si el canal actual está en la lista permitida
-            return str(ctx.channel.id) in allowed_channels
+            # Permite todos los canales si no se ha configurado ninguno para este servidor
+            return self.guild_settings.is_allowed(ctx.guild.id, ctx.channel.id)
         except Exception as e:
-            print(f"Error al verificar el permiso del canal: {e}")
+            log.exception("Error al verificar el permiso del canal: %s", e)
             return False
 
     @commands.hybrid_command(name="setinfochannel", description="Permite un canal para los comandos !info", with_app_command=True)
     @commands.has_permissions(administrator=True)
     @app_commands.default_permissions(administrator=True)
     async def set_info_channel(self, ctx: commands.Context, channel: discord.TextChannel):
-        guild_id = str(ctx.guild.id)
-        self.config_data["servers"].setdefault(guild_id, {"info_channels": [], "config": {}})
-        if str(channel.id) not in self.config_data["servers"][guild_id]["info_channels"]:
-            self.config_data["servers"][guild_id]["info_channels"].append(str(channel.id))
-            self.save_config()
+        if self.guild_settings.add_channel(ctx.guild.id, channel.id):
             await ctx.send(f"✅ {channel.mention} ahora está permitido para los comandos `!info`", ephemeral=True)
         else:
             await ctx.send(f"ℹ️ {channel.mention} ya está permitido para los comandos `!info`", ephemeral=True)
@@ -97,11 +152,8 @@ class InfoCommands(commands.Cog):
     @commands.has_permissions(administrator=True)
     @app_commands.default_permissions(administrator=True)
     async def remove_info_channel(self, ctx: commands.Context, channel: discord.TextChannel):
-        guild_id = str(ctx.guild.id)
-        if guild_id in self.config_data["servers"]:
-            if str(channel.id) in self.config_data["servers"][guild_id]["info_channels"]:
-                self.config_data["servers"][guild_id]["info_channels"].remove(str(channel.id))
-                self.save_config()
+        if self.guild_settings.has_guild(ctx.guild.id):
+            if self.guild_settings.remove_channel(ctx.guild.id, channel.id):
                 await ctx.send(f"✅ {channel.mention} ha sido eliminado de los canales permitidos", ephemeral=True)
             else:
                 await ctx.send(f"❌ {channel.mention} no está en la lista de canales permitidos", ephemeral=True)
@@ -112,12 +164,12 @@ class InfoCommands(commands.Cog):
     @commands.has_permissions(administrator=True)
     @app_commands.default_permissions(administrator=True)
     async def list_info_channels(self, ctx: commands.Context):
-        guild_id = str(ctx.guild.id)
+        allowed_channels = sorted(self.guild_settings.channels(ctx.guild.id))
 
-        if guild_id in self.config_data["servers"] and self.config_data["servers"][guild_id]["info_channels"]:
+        if allowed_channels:
             channels = []
-            for channel_id in self.config_data["servers"][guild_id]["info_channels"]:
-                channel = ctx.guild.get_channel(int(channel_id))
+            for channel_id in allowed_channels:
+                channel = ctx.guild.get_channel(channel_id)
                 channels.append(f"• {channel.mention if channel else f'ID: {channel_id}'}")
 
             embed = discord.Embed(
@@ -125,7 +177,7 @@ class InfoCommands(commands.Cog):
                 description="\n".join(channels),
                 color=discord.Color.blue()
             )
-            cooldown = self.config_data["servers"][guild_id]["config"].get("cooldown", self.config_data["global_settings"]["default_cooldown"])
+            cooldown = self.guild_settings.cooldown(ctx.guild.id, self.config_data["global_settings"]["default_cooldown"])
             embed.set_footer(text=f"Enfriamiento actual: {cooldown} segundos")
         else:
             embed = discord.Embed(
@@ -136,39 +188,74 @@ class InfoCommands(commands.Cog):
 
         await ctx.send(embed=embed, ephemeral=True)
 
+    @commands.hybrid_command(name="usage", description="Muestra el uso diario de los comandos en este servidor", with_app_command=True)
+    @commands.has_permissions(administrator=True)
+    @app_commands.default_permissions(administrator=True)
+    async def guild_usage(self, ctx: commands.Context):
+        limits = {"info": self.daily_limit_for(ctx.guild.id)}
+        like_cog = self.bot.get_cog("LikeCommands")
+        if like_cog is not None:
+            limits["like"] = like_cog.daily_limit_for(ctx.guild.id)
+
+        subscribed = self.quotas.is_subscribed(ctx.guild.id)
+        lines = []
+        for command, limit in limits.items():
+            used = self.quotas.used(command, ctx.guild.id)
+            cap = "∞" if subscribed or not limit else limit
+            lines.append(f"/{command:<5} {used:>5} / {cap}")
+
+        hours, minutes = divmod(int(self.quotas.resets_in() // 60), 60)
+        embed = discord.Embed(
+            title="Uso diario del servidor",
+            description="```\n" + "\n".join(lines) + "\n```",
+            color=discord.Color.gold() if subscribed else discord.Color.blue()
+        )
+        embed.add_field(name="Plan", value="Suscrito (sin límite)" if subscribed else "Estándar", inline=True)
+        embed.add_field(name="Reinicio", value=f"en {hours}h {minutes}m (UTC)", inline=True)
+        await ctx.send(embed=embed, ephemeral=True)
+
     @commands.hybrid_command(name="info", description="Muestra información sobre un jugador de Free Fire")
     @app_commands.describe(uid="INFO DE FREE FIRE")
     async def player_info(self, ctx: commands.Context, uid: str):
-        guild_id = str(ctx.guild.id)
-
         if not uid.isdigit() or len(uid) < 6:
             return await ctx.reply("¡UID inválido! Debe:\n- Contener solo números\n- Tener al menos 6 dígitos", mention_author=False, ephemeral=True)
+        tracer.tag(uid)
 
-        if not await self.is_channel_allowed(ctx):
+        with tracer.span("channel_check"):
+            allowed = await self.is_channel_allowed(ctx)
+        if not allowed:
+            channel_rejections.inc("info")
             return await ctx.send("Este comando no está permitido en este canal.", ephemeral=True)
 
-        cooldown = self.config_data["global_settings"]["default_cooldown"]
-        if guild_id in self.config_data["servers"]:
-            cooldown = self.config_data["servers"][guild_id]["config"].get("cooldown", cooldown)
+        cooldown = self.guild_settings.cooldown(ctx.guild.id, self.config_data["global_settings"]["default_cooldown"])
 
-        if ctx.author.id in self.cooldowns:
-            last_used = self.cooldowns[ctx.author.id]
-            if (datetime.now() - last_used).seconds < cooldown:
-                remaining = cooldown - (datetime.now() - last_used).seconds
-                return await ctx.send(f"Por favor, espera {remaining}s antes de usar este comando de nuevo.", ephemeral=True)
+        remaining = self.cooldowns.hit("info", ctx.author.id, cooldown)
+        if remaining > 0:
+            cooldown_rejections.inc("info")
+            return await ctx.send(f"Por favor, espera {remaining}s antes de usar este comando de nuevo.", ephemeral=True)
 
-        self.cooldowns[ctx.author.id] = datetime.now()
-       
+        reset_in = self.quotas.consume("info", ctx.guild.id, self.daily_limit_for(ctx.guild.id))
+        if reset_in > 0:
+            quota_rejections.inc("info")
+            self.cooldowns.reset("info", ctx.author.id)
+            hours, minutes = divmod(int(reset_in // 60), 60)
+            return await ctx.send(
+                f"Este servidor alcanzó su límite diario de !info. Se reinicia en {hours}h {minutes}m.", ephemeral=True
+            )
+
+        started = time.perf_counter()
+        image_task = asyncio.create_task(self.fetch_outfit_image(uid)) if INFO_PARALLEL_IMAGE else None
         try:
             async with ctx.typing():
-                async with self.session.get(f"{self.api_url}?uid={uid}") as response:
-                    if response.status == 404:
-                        return await ctx.send(f"Jugador con UID `{uid}` no encontrado.", ephemeral=True)
-                    if response.status != 200:
-                        return await ctx.send("Error de la API. Inténtalo de nuevo más tarde.", ephemeral=True)
-                    data = await response.json()
-
-            
+                with tracer.span("info_fetch"):
+                    status, data = await self.get_player_info(uid)
+                if status == 404:
+                    return await ctx.send(f"Jugador con UID `{uid}` no encontrado.", ephemeral=True)
+                if status != 200:
+                    self.quotas.refund("info", ctx.guild.id)
+                    return await ctx.send("Error de la API. Inténtalo de nuevo más tarde.", ephemeral=True)
+
+            build_started = time.perf_counter()
             basic_info = data.get('basicInfo', {})
             captain_info = data.get('captainBasicInfo', {})
             clan_info = data.get('clanBasicInfo', {})
@@ -251,31 +338,102 @@ class InfoCommands(commands.Cog):
 
 
             embed.set_footer(text="ImGui Magic")
-            await ctx.reply(embed=embed, mention_author=True)
-
-            if region and uid:
-                try:
-                    image_url = f"{self.generate_url}?uid={uid}"
-                    print(f"URL de la imagen = {image_url}")
-                    if image_url:
-                        async with self.session.get(image_url) as img_file:
-                            if img_file.status == 200:
-                                with io.BytesIO(await img_file.read()) as buf:
-                                    file = discord.File(buf, filename=f"outfit_{uuid.uuid4().hex[:8]}.png")
-                                    await ctx.send(file=file)
-                                    print("Imagen enviada con éxito")
-                            else:
-                                print(f"Error HTTP: {img_file.status}")
-                except Exception as e:
-                    print("La generación de la imagen falló:", e)
+            tracer.record("embed_build", build_started)
+
+            # Si la imagen ya llegó se adjunta al embed; si no, se envía después.
+            outfit = None
+            if image_task is not None and image_task.done():
+                outfit = self._outfit_file(await self._outfit_result(image_task))
+            if outfit:
+                with tracer.span("discord_send"):
+                    await ctx.reply(embed=embed, file=outfit, mention_author=True)
+            else:
+                with tracer.span("discord_send"):
+                    await ctx.reply(embed=embed, mention_author=True)
+                if image_task is None:
+                    image_task = asyncio.create_task(self.fetch_outfit_image(uid))
+                with tracer.span("image_wait"):
+                    outfit = self._outfit_file(await self._outfit_result(image_task))
+                if outfit:
+                    with tracer.span("image_send"):
+                        await ctx.send(file=outfit)
+            if outfit:
+                log.debug("Imagen enviada con éxito", extra={"command": "info", "uid": uid})
 
         except Exception as e:
             await ctx.send(f"Error inesperado: `{e}`", ephemeral=True)
         finally:
-            gc.collect()
+            if image_task is not None and not image_task.done():
+                image_task.cancel()
+            self.latency.record(time.perf_counter() - started)
+
+    async def fetch_outfit_image(self, uid):
+        """Path of the cached outfit image, or the downloaded bytes if it cannot be cached."""
+        if self.image_cache is not None:
+            path = self.image_cache.get(uid)
+            if path is not None:
+                return path
+        # Una descarga, una optimización y una escritura por UID aunque lo pidan varios a la vez.
+        return await self._image_flight.do(uid, lambda: self._download_outfit(uid))
+
+    async def _download_outfit(self, uid):
+        image_urls = [f"{url}?uid={uid}" for url in self.generate_urls]
+        log.debug("URL de la imagen = %s", image_urls[0], extra={"command": "info", "uid": uid})
+        status, body = await asyncio.wait_for(
+            self.upstream.fetch("generate", image_urls, uid, read="bytes"), IMAGE_DEADLINE
+        )
+        if status != 200:
+            log.warning("Error HTTP al generar la imagen", extra={"command": "info", "uid": uid, "status": status})
+            return None
+        if self.optimizer is not None:
+            with tracer.span("image_optimize"):
+                body = await self.optimizer.optimize(body)
+        if self.image_cache is None:
+            return body
+        try:
+            with tracer.span("image_cache_write"):
+                return await self.image_cache.put(uid, body)
+        except OSError as e:
+            log.warning("No se pudo guardar la imagen en caché: %s", e)
+            return body
+
+    async def _outfit_result(self, image_task):
+        try:
+            return await image_task
+        except asyncio.TimeoutError:
+            log.warning("La generación de la imagen superó el límite de %ss", IMAGE_DEADLINE)
+        except Exception as e:
+            log.warning("La generación de la imagen falló: %s", e)
+        return None
+
+    def _outfit_file(self, image):
+        if not image:
+            return None
+        if isinstance(image, bytes):
+            return discord.File(io.BytesIO(image), filename=f"outfit_{uuid.uuid4().hex[:8]}{image_extension(image[:12])}")
+        # Desde disco: discord.py lee el archivo al subirlo, sin cargarlo entero en memoria.
+        try:
+            fp = open(image, "rb")
+        except OSError:
+            return None
+        extension = image_extension(fp.read(12))
+        fp.seek(0)
+        return discord.File(fp, filename=f"outfit_{uuid.uuid4().hex[:8]}{extension}")
+
+    async def cog_load(self):
+        if self.optimizer is not None:
+            self.optimizer.start()
 
     async def cog_unload(self):
-        await self.session.close()
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        if self.optimizer is not None:
+            self.optimizer.close()
+        self.bot.config_stores.remove(self.config_store)
+        await self.config_store.close()
+        if self.image_cache is not None:
+            self.bot.config_stores.remove(self.image_cache.store)
+            await self.image_cache.store.close()
 
     async def _send_player_not_found(self, ctx, uid):
         embed = discord.Embed(
@@ -1,24 +1,86 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiohttp
 from datetime import datetime
 import json
+import logging
 import os
 import asyncio
+import math
+import re
+import time
+from typing import Optional
 from dotenv import load_dotenv
 
+from utils.guild_settings import JsonGuildSettings
+from utils.http import hosts_from_env
+from utils.jobqueue import LIKE_QUEUE_PATH, JobQueue
+from utils.metrics import channel_rejections, cooldown_rejections, quota_rejections
+from utils.negative_cache import EXHAUSTED, NegativeCache
+from utils.persistence import JsonStore
+from utils.runtime import loads
+from utils.tracing import tracer
+
+log = logging.getLogger(__name__)
+
 load_dotenv()
 RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
 CONFIG_FILE = "like_channels.json"
+LIKE_COOLDOWN = int(os.getenv("LIKE_COOLDOWN", 30))
+# 0 = sin límite diario por servidor (salvo que el servidor tenga uno propio).
+LIKE_DAILY_LIMIT = int(os.getenv("LIKE_DAILY_LIMIT", 0))
+LIKE_BATCH_CONCURRENCY = int(os.getenv("LIKE_BATCH_CONCURRENCY", 4))
+LIKE_BATCH_MAX = int(os.getenv("LIKE_BATCH_MAX", 100))
+LIKE_BATCH_PROGRESS_INTERVAL = 2.0
+# LIKE_QUEUE=0 vuelve a llamar a la API dentro del propio comando.
+LIKE_QUEUE = os.getenv("LIKE_QUEUE", "1") != "0"
+# Los tokens de interacción caducan a los 15 minutos; después se responde en el canal.
+INTERACTION_TOKEN_TTL = 14 * 60
+
+UID_PATTERN = re.compile(r"\d+")
+
+class JobReply:
+    """Delivers a queued job's messages as interaction follow-ups, or in its channel once the token is gone."""
+
+    def __init__(self, bot, job):
+        self.user_id = job["user_id"]
+        self.channel = bot.get_partial_messageable(job["channel_id"], guild_id=job["guild_id"])
+        self.webhook = None
+        if job["token"] and time.time() - job["created_at"] < INTERACTION_TOKEN_TTL:
+            # Webhook de aplicación (tipo 3), como ``Interaction.followup``: Webhook.partial crea uno
+            # entrante (tipo 1) y discord.py rechaza en él los mensajes efímeros.
+            self.webhook = discord.Webhook.from_state(
+                {"id": job["application_id"], "type": 3, "token": job["token"]}, bot._connection
+            )
+
+    async def send(self, content=None, *, embed=None, ephemeral=False):
+        kwargs = {"embed": embed} if embed is not None else {}
+        if self.webhook is not None:
+            try:
+                return await self.webhook.send(content or discord.utils.MISSING, ephemeral=ephemeral, **kwargs)
+            except discord.HTTPException:
+                self.webhook = None
+        mention = f"<@{self.user_id}>"
+        return await self.channel.send(f"{mention} {content}" if content else mention, **kwargs)
+
 
 class LikeCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.api_host = "https://freelike-nx2.vercel.app/"
+        self.api_hosts = hosts_from_env("LIKE_API_HOSTS", "https://freelike-nx2.vercel.app")
         self.config_data = self.load_config()
-        self.cooldowns = {}
-        self.session = aiohttp.ClientSession()
+        self.config_store = JsonStore(CONFIG_FILE, self.config_data)
+        bot.config_stores.append(self.config_store)
+        if bot.guild_db is not None:
+            self.guild_settings = bot.guild_db.settings("like")
+        else:
+            self.guild_settings = JsonGuildSettings("like", self.config_store, "like_channels", ("cooldown",))
+        self.cooldowns = bot.cooldowns
+        self.quotas = bot.quotas
+        self.upstream = bot.upstream
+        self.negative_cache = NegativeCache()
+        bot.config_stores.append(self.negative_cache.store)
+        self.queue = JobQueue("like", self._run_like_job, LIKE_QUEUE_PATH) if LIKE_QUEUE else None
 
         self.headers = {}
         if RAPIDAPI_KEY:
@@ -34,47 +96,58 @@ class LikeCommands(commands.Cog):
         if os.path.exists(CONFIG_FILE):
             try:
                 with open(CONFIG_FILE, 'r') as f:
-                    loaded_config = json.load(f)
+                    loaded_config = loads(f.read())
                     loaded_config.setdefault("servers", {})
                     return loaded_config
             except json.JSONDecodeError:
-                print(f"ADVERTENCIA: El archivo de configuración '{CONFIG_FILE}' está corrupto o vacío. Restableciendo la configuración por defecto.")
-        self.save_config(default_config)
+                log.warning("El archivo de configuración '%s' está corrupto o vacío. Restableciendo la configuración por defecto.", CONFIG_FILE)
         return default_config
 
-    def save_config(self, config_to_save=None):
-        data_to_save = config_to_save if config_to_save is not None else self.config_data
-        temp_file = CONFIG_FILE + ".tmp"
-        with open(temp_file, 'w') as f:
-            json.dump(data_to_save, f, indent=4)
-        os.replace(temp_file, CONFIG_FILE)
+    def save_config(self):
+        self.config_store.save()
 
     async def check_channel(self, ctx):
         if ctx.guild is None:
             return True
-        guild_id = str(ctx.guild.id)
-        like_channels = self.config_data["servers"].get(guild_id, {}).get("like_channels", [])
-        return not like_channels or str(ctx.channel.id) in like_channels
+        return self.guild_settings.is_allowed(ctx.guild.id, ctx.channel.id)
+
+    def cooldown_for(self, guild):
+        if guild is None:
+            return LIKE_COOLDOWN
+        return self.guild_settings.cooldown(guild.id, LIKE_COOLDOWN)
+
+    def daily_limit_for(self, guild_id):
+        return self.guild_settings.daily_limit(guild_id, LIKE_DAILY_LIMIT)
+
+    def _refund(self, guild_id):
+        if guild_id is not None:
+            self.quotas.refund("like", guild_id)
 
     async def cog_load(self):
-        pass
+        if self.bot.guild_db is None and not os.path.exists(CONFIG_FILE):
+            self.save_config()
+        if self.queue is not None:
+            await self.queue.start()
+            self.bot.job_queues.append(self.queue)
+
+    async def cog_unload(self):
+        if self.queue is not None:
+            if self.queue in self.bot.job_queues:
+                self.bot.job_queues.remove(self.queue)
+            await self.queue.close()
+        self.bot.config_stores.remove(self.config_store)
+        await self.config_store.close()
+        self.bot.config_stores.remove(self.negative_cache.store)
+        await self.negative_cache.store.close()
 
     @commands.hybrid_command(name="setlikechannel", description="✅ Permitir el comando /like en un canal.", with_app_command=True)
     @commands.has_permissions(administrator=True)
     @app_commands.default_permissions(administrator=True)
     @app_commands.describe(channel="El canal en el que se permitirá el comando /like.")
     async def set_like_channel(self, ctx: commands.Context, channel: discord.TextChannel):
-        guild_id = str(ctx.guild.id)
-        server_config = self.config_data["servers"].setdefault(guild_id, {})
-        like_channels = server_config.setdefault("like_channels", [])
-
-        channel_id_str = str(channel.id)
-
-        if channel_id_str in like_channels:
+        if not self.guild_settings.add_channel(ctx.guild.id, channel.id):
             await ctx.send(f"⚠️ {channel.mention} ya está permitido para /like.", ephemeral=True)
         else:
-            like_channels.append(channel_id_str)
-            self.save_config()
             await ctx.send(f"✅ {channel.mention} ha sido añadido a los canales permitidos para /like.", ephemeral=True)
 
     @commands.hybrid_command(name="removelikechannel", description="❌ No permitir el comando /like en un canal.", with_app_command=True)
@@ -82,15 +155,7 @@ class LikeCommands(commands.Cog):
     @app_commands.default_permissions(administrator=True)
     @app_commands.describe(channel="El canal en el que no se permitirá el comando /like.")
     async def remove_like_channel(self, ctx: commands.Context, channel: discord.TextChannel):
-        guild_id = str(ctx.guild.id)
-        server_config = self.config_data["servers"].setdefault(guild_id, {})
-        like_channels = server_config.setdefault("like_channels", [])
-
-        channel_id_str = str(channel.id)
-
-        if channel_id_str in like_channels:
-            like_channels.remove(channel_id_str)
-            self.save_config()
+        if self.guild_settings.remove_channel(ctx.guild.id, channel.id):
             await ctx.send(f"❌ {channel.mention} ha sido eliminado de los canales permitidos para /like.", ephemeral=True)
         else:
             await ctx.send(f"⚠️ {channel.mention} no estaba en la lista de canales permitidos.", ephemeral=True)
@@ -99,9 +164,7 @@ class LikeCommands(commands.Cog):
     @commands.has_permissions(administrator=True)
     @app_commands.default_permissions(administrator=True)
     async def list_like_channels(self, ctx: commands.Context):
-        guild_id = str(ctx.guild.id)
-        server_config = self.config_data["servers"].get(guild_id, {})
-        like_channels = server_config.get("like_channels", [])
+        like_channels = sorted(self.guild_settings.channels(ctx.guild.id))
 
         if not like_channels:
             await ctx.send("ℹ️ No hay canales restringidos — `/like` está permitido en todas partes.", ephemeral=True)
@@ -109,7 +172,7 @@ class LikeCommands(commands.Cog):
 
         mentions = []
         for channel_id in like_channels:
-            channel = self.bot.get_channel(int(channel_id))
+            channel = self.bot.get_channel(channel_id)
             if channel:
                 mentions.append(channel.mention)
             else:
@@ -122,10 +185,13 @@ class LikeCommands(commands.Cog):
     @app_commands.describe(uid="UID del jugador (solo números, mínimo 6 caracteres)")
     async def like_command(self, ctx: commands.Context, uid: str):
         is_slash = ctx.interaction is not None
+        tracer.tag(uid)
 
-        if not await self.check_channel(ctx):
-            guild_id = str(ctx.guild.id)
-            allowed_ids = self.config_data["servers"].get(guild_id, {}).get("like_channels", [])
+        with tracer.span("channel_check"):
+            allowed = await self.check_channel(ctx)
+        if not allowed:
+            channel_rejections.inc("like")
+            allowed_ids = sorted(self.guild_settings.channels(ctx.guild.id))
 
             if allowed_ids:
                 allowed_mentions = ", ".join(f"<#{ch_id}>" for ch_id in allowed_ids)
@@ -139,79 +205,336 @@ class LikeCommands(commands.Cog):
             await ctx.send(msg, ephemeral=True)
             return
 
-        user_id = ctx.author.id
-        cooldown = 30
-        if user_id in self.cooldowns:
-            last_used = self.cooldowns[user_id]
-            remaining = cooldown - (datetime.now() - last_used).seconds
-            if remaining > 0:
-                await ctx.send(f"Por favor, espera {remaining} segundos antes de usar este comando de nuevo.", ephemeral=True)
-                return
-        self.cooldowns[user_id] = datetime.now()
+        remaining = self.cooldowns.hit("like", ctx.author.id, self.cooldown_for(ctx.guild))
+        if remaining > 0:
+            cooldown_rejections.inc("like")
+            await ctx.send(f"Por favor, espera {remaining} segundos antes de usar este comando de nuevo.", ephemeral=True)
+            return
 
         if not uid.isdigit() or len(uid) < 6:
             await ctx.send("UID inválido. Debe contener solo números y tener al menos 6 caracteres.", ephemeral=True)
             return
 
-        try:
+        # Resultado conocido (máximo diario o UID inexistente): se responde sin llamar a la API ni gastar cuota.
+        known = self.negative_cache.get(uid)
+        if known is not None:
+            await self._send_known_result(ctx, uid, known)
+            return
+
+        if ctx.guild is not None:
+            reset_in = self.quotas.consume("like", ctx.guild.id, self.daily_limit_for(ctx.guild.id))
+            if reset_in > 0:
+                quota_rejections.inc("like")
+                self.cooldowns.reset("like", ctx.author.id)
+                await self._send_quota_reached(ctx, reset_in)
+                return
+
+        guild_id = ctx.guild.id if ctx.guild else None
+        if self.queue is not None:
+            await self._enqueue_like(ctx, uid, guild_id)
+            return
+
+        wait = self.upstream.check_budget(self.like_urls(uid), self.headers)
+        if wait > 0:
+            # El rechazo es local: no se cobra el enfriamiento del usuario ni la cuota del servidor.
+            self.cooldowns.reset("like", ctx.author.id)
+            self._refund(guild_id)
+            await self._send_api_limit_reached(ctx, wait)
+            return
+
+        with tracer.span("defer"):
             await ctx.defer(ephemeral=False)
-            async with self.session.get(f"{self.api_host}/like?uid={uid}", headers=self.headers) as response:
-                if response.status == 404:
-                    await self._send_player_not_found(ctx, uid)
-                    return
-                if response.status != 200:
-                    print(f"Error de API: {response.status} - {await response.text()}")
-                    await self._send_api_error(ctx)
-                    return
-
-                data = await response.json()
-                embed = discord.Embed(
-                    title="``LIKES PARA FREE FIRE``",
-                    color=0x2ECC71 if data.get("status") == 1 else 0xE74C3C,
-                    timestamp=datetime.now()
-                )
+        await self._deliver_like(ctx, uid, guild_id)
+
+    async def _enqueue_like(self, ctx, uid, guild_id):
+        # Solo se rechaza de antemano si los hosts piden esperar (Retry-After); un presupuesto propio
+        # agotado se recupera en segundos y el trabajo lo espera en la cola.
+        urls = self.like_urls(uid)
+        blocked = self.upstream.blocked_for(urls, self.headers)
+        if blocked > 0:
+            self.upstream.governor.reject(urls, self.headers)
+            self.cooldowns.reset("like", ctx.author.id)
+            self._refund(guild_id)
+            await self._send_api_limit_reached(ctx, blocked)
+            return
+        job = {
+            "uid": uid,
+            "guild_id": guild_id,
+            "channel_id": ctx.channel.id,
+            "user_id": ctx.author.id,
+            "application_id": ctx.interaction.application_id if ctx.interaction else None,
+            "token": ctx.interaction.token if ctx.interaction else None,
+            "created_at": time.time(),
+        }
+        try:
+            with tracer.span("enqueue"):
+                job_id, position = await self.queue.enqueue(job)
+        except Exception as e:
+            log.error("No se pudo encolar el like: %s", e, extra={"command": "like", "guild": guild_id, "uid": uid})
+            self.cooldowns.reset("like", ctx.author.id)
+            self._refund(guild_id)
+            await self._send_error_embed(ctx, "⚡ Error Crítico", "No se pudo registrar la solicitud. Inténtalo de nuevo más tarde.")
+            return
+        ahead = f"{position - 1} solicitudes por delante" if position > 1 else "eres el siguiente"
+        await ctx.send(f"⏳ Solicitud #{job_id} para el UID `{uid}` en cola ({ahead}). El resultado llegará aquí.", ephemeral=True)
+
+    async def _run_like_job(self, job):
+        blocked = await self._wait_for_budget(self.like_urls(job["uid"]))
+        if blocked > 0:
+            self._refund(job["guild_id"])
+            await self._send_api_limit_reached(JobReply(self.bot, job), blocked)
+            return
+        await self._deliver_like(JobReply(self.bot, job), job["uid"], job["guild_id"])
+
+    async def _wait_for_budget(self, urls):
+        """Wait for the hosts' own request budget; returns the Retry-After wait instead of sleeping through it.
+
+        Sleeping through a Retry-After would hold a queue worker (or batch slot) for
+        minutes and could outlive the interaction token of every job behind it.
+        """
+        while (wait := self.upstream.budget_wait(urls, self.headers)) > 0:
+            blocked = self.upstream.blocked_for(urls, self.headers)
+            if blocked > 0:
+                self.upstream.governor.reject(urls, self.headers)
+                return blocked
+            await asyncio.sleep(wait)
+        return 0.0
+
+    async def _deliver_like(self, target, uid, guild_id):
+        """Call the like API for ``uid`` and send the result to ``target`` (a Context or JobReply)."""
+        # Otro trabajo de la cola pudo averiguar el resultado mientras este esperaba.
+        known = self.negative_cache.get(uid)
+        if known is not None:
+            self._refund(guild_id)
+            await self._send_known_result(target, uid, known)
+            return
+
+        try:
+            with tracer.span("like_api"):
+                status, data = await self.request_like(uid)
+            if status == 404:
+                self.negative_cache.mark_not_found(uid)
+                await self._send_player_not_found(target, uid)
+                return
+            if status == 429:
+                self._refund(guild_id)
+                await self._send_api_limit_reached(target, self.upstream.budget_wait(self.like_urls(uid), self.headers))
+                return
+            if status != 200:
+                log.warning("Error de API: %s", data, extra={"command": "like", "guild": guild_id, "uid": uid, "status": status})
+                self._refund(guild_id)
+                await self._send_api_error(target)
+                return
 
-                if data.get("status") == 1:
-                    embed.description = (
-                        f"```\n"
-                        f"┌  CUENTA\n"
-                        f"├─ APODO: {data.get('nickname', 'Desconocido')}\n"
-                        f"├─ UID: {uid}\n"
-                        f"├─ REGIÓN: {data.get('region', 'Desconocida')}\n"
-                        f"└─ RESULTADO:\n"
-                        f"    ├─ AÑADIDOS: +{data.get('likes_added', 0)}\n"
-                        f"    ├─ ANTES: {data.get('likes_before', 'N/A')}\n"
-                        f"    └─ DESPUÉS: {data.get('likes_after', 'N/A')}\n"
-                        f"```"
-                    )
-                else:
-                    embed.description = (
-                        f"\n"
-                        f"```LIKES MÁXIMOS\n"
-                        f"Este UID ya ha recibido el máximo de likes por hoy.```\n"
-                    )
-
-                embed.set_footer(text="</>:  BRAYANZIN.CX44")
-                embed.description += "\nÚNETE: https://discord.gg/VvJWxj6TrU"
-                await ctx.send(embed=embed)
+            if data.get("status") != 1:
+                self.negative_cache.mark_exhausted(uid)
+            embed = self._like_embed(uid, data)
+            with tracer.span("discord_send"):
+                await target.send(embed=embed)
 
         except asyncio.TimeoutError:
-            await self._send_error_embed(ctx, "Tiempo de espera agotado", "El servidor tardó demasiado en responder.", ephemeral=True)
+            self._refund(guild_id)
+            await self._send_error_embed(target, "Tiempo de espera agotado", "El servidor tardó demasiado en responder.", ephemeral=True)
         except Exception as e:
-            print(f"Error inesperado en like_command: {e}")
-            await self._send_error_embed(ctx, "⚡ Error Crítico", "Ocurrió un error inesperado. Por favor, inténtalo de nuevo más tarde.", ephemeral=True)
+            log.exception("Error inesperado en like_command: %s", e, extra={"command": "like", "guild": guild_id, "uid": uid})
+            self._refund(guild_id)
+            await self._send_error_embed(target, "⚡ Error Crítico", "Ocurrió un error inesperado. Por favor, inténtalo de nuevo más tarde.", ephemeral=True)
+
+    def _like_embed(self, uid, data):
+        embed = discord.Embed(
+            title="``LIKES PARA FREE FIRE``",
+            color=0x2ECC71 if data.get("status") == 1 else 0xE74C3C,
+            timestamp=datetime.now()
+        )
+
+        if data.get("status") == 1:
+            embed.description = (
+                f"```\n"
+                f"┌  CUENTA\n"
+                f"├─ APODO: {data.get('nickname', 'Desconocido')}\n"
+                f"├─ UID: {uid}\n"
+                f"├─ REGIÓN: {data.get('region', 'Desconocida')}\n"
+                f"└─ RESULTADO:\n"
+                f"    ├─ AÑADIDOS: +{data.get('likes_added', 0)}\n"
+                f"    ├─ ANTES: {data.get('likes_before', 'N/A')}\n"
+                f"    └─ DESPUÉS: {data.get('likes_after', 'N/A')}\n"
+                f"```"
+            )
+        else:
+            embed.description = (
+                f"\n"
+                f"```LIKES MÁXIMOS\n"
+                f"Este UID ya ha recibido el máximo de likes por hoy.```\n"
+            )
+
+        embed.set_footer(text="</>:  BRAYANZIN.CX44")
+        embed.description += "\nÚNETE: https://discord.gg/VvJWxj6TrU"
+        return embed
+
+    async def _send_known_result(self, target, uid, known):
+        if known == EXHAUSTED:
+            await target.send(embed=self._like_embed(uid, {}))
+        else:
+            await self._send_player_not_found(target, uid)
+
+    def like_urls(self, uid):
+        return [f"{host}/like?uid={uid}" for host in self.api_hosts]
+
+    async def request_like(self, uid):
+        return await self.upstream.fetch("like", self.like_urls(uid), uid, headers=self.headers)
+
+    @staticmethod
+    def parse_uids(text):
+        """Unique UIDs from ``text`` in order of appearance, plus the invalid tokens."""
+        uids, invalid = {}, []
+        for token in UID_PATTERN.findall(text):
+            if len(token) < 6:
+                invalid.append(token)
+            else:
+                uids.setdefault(token, None)
+        return list(uids), invalid
+
+    async def _batch_like(self, uid, guild_id):
+        known = self.negative_cache.get(uid)
+        if known is not None:
+            return "maxed" if known == EXHAUSTED else "not_found"
+        if guild_id is not None and self.quotas.consume("like", guild_id, self.daily_limit_for(guild_id)) > 0:
+            quota_rejections.inc("likebatch")
+            return "failed"
+        # El lote espera al presupuesto del host en vez de rechazar como /like (salvo Retry-After).
+        if await self._wait_for_budget(self.like_urls(uid)) > 0:
+            if guild_id is not None:
+                self.quotas.refund("like", guild_id)
+            return "failed"
+        try:
+            status, data = await self.request_like(uid)
+        except Exception as e:
+            log.warning("Error en likebatch: %s", e, extra={"command": "likebatch", "guild": guild_id, "uid": uid})
+            status = None
+        if status == 404:
+            self.negative_cache.mark_not_found(uid)
+            return "not_found"
+        if status != 200:
+            if guild_id is not None:
+                self.quotas.refund("like", guild_id)
+            return "failed"
+        if data.get("status") != 1:
+            self.negative_cache.mark_exhausted(uid)
+            return "maxed"
+        return "added"
+
+    @commands.hybrid_command(name="likebatch", description="📦 Envía likes a varios UIDs a la vez.", with_app_command=True)
+    @commands.has_permissions(administrator=True)
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(uids="UIDs separados por espacios, comas o saltos de línea.", file="Archivo .txt con un UID por línea.")
+    async def like_batch(self, ctx: commands.Context, file: Optional[discord.Attachment] = None, *, uids: str = ""):
+        if not await self.check_channel(ctx):
+            channel_rejections.inc("likebatch")
+            await ctx.send("🚫 Este comando **no está permitido** en este canal.", ephemeral=True)
+            return
+
+        await ctx.defer(ephemeral=False)
+        text = uids
+        if file is not None:
+            try:
+                text += "\n" + (await file.read()).decode("utf-8", errors="ignore")
+            except discord.HTTPException:
+                await self._send_error_embed(ctx, "Archivo ilegible", "No se pudo descargar el archivo adjunto.")
+                return
+
+        uid_list, invalid = self.parse_uids(text)
+        if not uid_list:
+            await ctx.send("UID inválido. Debe contener solo números y tener al menos 6 caracteres.", ephemeral=True)
+            return
+        if len(uid_list) > LIKE_BATCH_MAX:
+            await ctx.send(f"⚠️ Máximo {LIKE_BATCH_MAX} UIDs por lote (recibidos {len(uid_list)}).", ephemeral=True)
+            return
+
+        guild_id = ctx.guild.id if ctx.guild else None
+        if guild_id is not None and not self.quotas.is_subscribed(guild_id):
+            limit = self.daily_limit_for(ctx.guild.id)
+            left = limit - self.quotas.used("like", guild_id) if limit else len(uid_list)
+            if left < len(uid_list):
+                quota_rejections.inc("likebatch")
+                await ctx.send(
+                    f"⚠️ Cuota diaria insuficiente: quedan {max(left, 0)} de {limit} likes hoy para {len(uid_list)} UIDs.",
+                    ephemeral=True,
+                )
+                return
+
+        results = {}
+        semaphore = asyncio.Semaphore(LIKE_BATCH_CONCURRENCY)
+        progress = await ctx.send(embed=self._batch_embed(uid_list, results, invalid))
+        last_edit = time.monotonic()
+
+        async def run(uid):
+            async with semaphore:
+                results[uid] = await self._batch_like(uid, guild_id)
+
+        tasks = [asyncio.ensure_future(run(uid)) for uid in uid_list]
+        try:
+            pending = set(tasks)
+            while pending:
+                _, pending = await asyncio.wait(pending, timeout=LIKE_BATCH_PROGRESS_INTERVAL)
+                # Se edita un único mensaje, como mucho cada LIKE_BATCH_PROGRESS_INTERVAL segundos.
+                if pending and time.monotonic() - last_edit >= LIKE_BATCH_PROGRESS_INTERVAL:
+                    last_edit = time.monotonic()
+                    try:
+                        await progress.edit(embed=self._batch_embed(uid_list, results, invalid))
+                    except discord.HTTPException:
+                        pass
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        embed = self._batch_embed(uid_list, results, invalid)
+        try:
+            await progress.edit(embed=embed)
+        except discord.HTTPException:
+            await ctx.send(embed=embed)
+
+    def _batch_embed(self, uid_list, results, invalid):
+        counts = {"added": 0, "maxed": 0, "not_found": 0, "failed": 0}
+        for outcome in results.values():
+            counts[outcome] += 1
+        done = len(results) == len(uid_list)
+        embed = discord.Embed(
+            title="``LIKES EN LOTE``",
+            color=0x2ECC71 if done else 0x3498DB,
+            timestamp=datetime.now()
+        )
+        embed.description = (
+            f"```\n"
+            f"PROGRESO: {len(results)}/{len(uid_list)}\n"
+            f"┌  RESUMEN\n"
+            f"├─ AÑADIDOS:    {counts['added']:>4}\n"
+            f"├─ YA MÁXIMOS:  {counts['maxed']:>4}\n"
+            f"├─ NO EXISTEN:  {counts['not_found']:>4}\n"
+            f"└─ FALLIDOS:    {counts['failed']:>4}\n"
+            f"```"
+        )
+        if invalid:
+            embed.add_field(name="Ignorados (UID inválido)", value=", ".join(invalid[:20])[:1024], inline=False)
+        if done:
+            failed = [uid for uid in uid_list if results[uid] in ("failed", "not_found")]
+            if failed:
+                embed.add_field(name="Sin likes", value=", ".join(failed[:30])[:1024], inline=False)
+        embed.set_footer(text="</>:  BRAYANZIN.CX44")
+        return embed
 
     async def _send_player_not_found(self, ctx, uid):
         embed = discord.Embed(title="❌ Jugador No Encontrado", description=f"El UID {uid} no existe o no es accesible.", color=0xE74C3C)
         embed.add_field(name="Consejo", value="Asegúrate de que:\n- El UID es correcto\n- El perfil del jugador no es privado", inline=False)
         await ctx.send(embed=embed, ephemeral=True)
         
-    async def _send_api_limit_reached(self, ctx):
+    async def _send_api_limit_reached(self, ctx, wait=None):
         embed = discord.Embed(
             title="⚠️ Límite de Tasa de API Alcanzado",
             description="Has alcanzado el número máximo de solicitudes permitidas por la API.",
             color=0xF1C40F
         )
+        if wait:
+            embed.description += f"\nInténtalo de nuevo en {math.ceil(wait)} segundos."
         embed.add_field(
             name="Consejo",
             value=(
@@ -223,6 +546,15 @@ class LikeCommands(commands.Cog):
         )
         await ctx.send(embed=embed, ephemeral=True)
 
+    async def _send_quota_reached(self, ctx, reset_in):
+        hours, minutes = divmod(math.ceil(reset_in / 60), 60)
+        embed = discord.Embed(
+            title="⚠️ Límite Diario del Servidor Alcanzado",
+            description=f"Este servidor ya usó todas sus solicitudes de hoy.\nLa cuota se reinicia en {hours}h {minutes}m.",
+            color=0xF1C40F
+        )
+        await ctx.send(embed=embed, ephemeral=True)
+
     async def _send_api_error(self, ctx):
         embed = discord.Embed(title="⚠️ Servicio No Disponible", description="La API de Free Fire no está respondiendo en este momento.", color=0xF39C12)
         embed.add_field(name="Solución", value="Inténtalo de nuevo en unos minutos.", inline=False)
@@ -233,8 +565,5 @@ class LikeCommands(commands.Cog):
         embed.set_footer(text="Ocurrió un error.")
         await ctx.send(embed=embed, ephemeral=ephemeral)
 
-    def cog_unload(self):
-        self.bot.loop.create_task(self.session.close())
-
 async def setup(bot):
     await bot.add_cog(LikeCommands(bot))
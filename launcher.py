@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import signal
+import sys
+
+import aiohttp
+from aiohttp import web
+from dotenv import load_dotenv
+
+if os.path.exists(".env"):
+    load_dotenv()
+
+from utils.log import setup_logging
+from utils.runtime import install_event_loop
+
+log = logging.getLogger("launcher")
+
+TOKEN = os.getenv("TOKEN")
+CLUSTER_COUNT = int(os.getenv("CLUSTER_COUNT", 2))
+SHARD_COUNT = os.getenv("SHARD_COUNT")
+STATUS_PORT = int(os.environ.get("PORT", 10000))
+RESTART_DELAY = float(os.getenv("CLUSTER_RESTART_DELAY", 5))
+
+SAMPLE_LINE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})?( .*)$")
+
+
+def cluster_port(cluster_id):
+    return STATUS_PORT + 1 + cluster_id
+
+
+def shard_groups(shard_count, cluster_count):
+    """Split shard ids 0..shard_count-1 into ``cluster_count`` contiguous groups."""
+    cluster_count = max(1, min(cluster_count, shard_count))
+    size, extra = divmod(shard_count, cluster_count)
+    groups, start = [], 0
+    for cluster_id in range(cluster_count):
+        end = start + size + (1 if cluster_id < extra else 0)
+        groups.append(list(range(start, end)))
+        start = end
+    return groups
+
+
+async def recommended_shards():
+    headers = {"Authorization": f"Bot {TOKEN}"}
+    async with aiohttp.ClientSession() as session:
+        async with session.get("https://discord.com/api/v10/gateway/bot", headers=headers) as response:
+            response.raise_for_status()
+            return (await response.json())["shards"]
+
+
+def run_cluster(cluster_id, shard_ids, shard_count, cluster_count):
+    # Cada proceso tiene su propio loop, su pool de conexiones y su servidor de estado local.
+    os.environ.update({
+        "CLUSTER_ID": str(cluster_id),
+        "CLUSTER_COUNT": str(cluster_count),
+        "SHARD_IDS": ",".join(str(shard_id) for shard_id in shard_ids),
+        "SHARD_COUNT": str(shard_count),
+        "PORT": str(cluster_port(cluster_id)),
+        "STATUS_HOST": "127.0.0.1",
+        # La configuración de canales se comparte entre procesos a través de SQLite.
+        "GUILD_STORE": "sqlite",
+    })
+    import app
+    app.main()
+
+
+def label_metrics(text, cluster_id, seen_headers):
+    lines = []
+    for line in text.splitlines():
+        if line.startswith("#"):
+            if line not in seen_headers:
+                seen_headers.add(line)
+                lines.append(line)
+            continue
+        match = SAMPLE_LINE.match(line)
+        if match is None:
+            continue
+        name, labels, value = match.groups()
+        inner = labels[1:-1] if labels else ""
+        labels = f'cluster="{cluster_id}"' + (f",{inner}" if inner else "")
+        lines.append(f"{name}{{{labels}}}{value}")
+    return lines
+
+
+class Launcher:
+    """Runs one bot process per shard group and aggregates their status endpoints."""
+
+    def __init__(self, groups, shard_count):
+        self.groups = groups
+        self.shard_count = shard_count
+        self.processes = {}
+        self.restarts = {cluster_id: 0 for cluster_id in range(len(groups))}
+        self.session = None
+        self._stopping = False
+
+    def spawn(self, cluster_id):
+        process = multiprocessing.Process(
+            target=run_cluster,
+            args=(cluster_id, self.groups[cluster_id], self.shard_count, len(self.groups)),
+            name=f"cluster-{cluster_id}",
+        )
+        process.start()
+        self.processes[cluster_id] = process
+        log.info("Cluster %d started (pid %d, shards %s)", cluster_id, process.pid, self.groups[cluster_id], extra={"cluster": cluster_id})
+
+    async def supervise(self):
+        while not self._stopping:
+            await asyncio.sleep(1)
+            for cluster_id, process in list(self.processes.items()):
+                if process.is_alive() or self._stopping:
+                    continue
+                log.warning("Cluster %d exited with code %s, restarting in %ss", cluster_id, process.exitcode, RESTART_DELAY, extra={"cluster": cluster_id})
+                self.restarts[cluster_id] += 1
+                await asyncio.sleep(RESTART_DELAY)
+                self.spawn(cluster_id)
+
+    async def _get(self, cluster_id, path):
+        url = f"http://127.0.0.1:{cluster_port(cluster_id)}{path}"
+        try:
+            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=2)) as response:
+                if path == "/readyz":
+                    return await response.json()
+                return await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return None
+
+    async def clusters(self):
+        results = await asyncio.gather(*(self._get(cluster_id, "/readyz") for cluster_id in range(len(self.groups))))
+        status = {}
+        for cluster_id, result in enumerate(results):
+            process = self.processes.get(cluster_id)
+            status[cluster_id] = {
+                "pid": process.pid if process else None,
+                "alive": bool(process and process.is_alive()),
+                "restarts": self.restarts[cluster_id],
+                "shards": self.groups[cluster_id],
+                "ready": bool(result and result.get("ready")),
+                "guilds": result.get("guilds") if result else None,
+                "latency": result.get("latency") if result else None,
+            }
+        return status
+
+    async def home(self, request):
+        return web.Response(text=f"Launcher running {len(self.groups)} clusters / {self.shard_count} shards")
+
+    async def live(self, request):
+        return web.json_response({"status": "ok"})
+
+    async def ready(self, request):
+        clusters = await self.clusters()
+        ready = all(cluster["ready"] for cluster in clusters.values())
+        guilds = sum(cluster["guilds"] or 0 for cluster in clusters.values())
+        return web.json_response(
+            {"ready": ready, "guilds": guilds, "clusters": clusters},
+            status=200 if ready else 503,
+        )
+
+    async def metrics(self, request):
+        texts = await asyncio.gather(*(self._get(cluster_id, "/metrics") for cluster_id in range(len(self.groups))))
+        seen_headers, lines = set(), []
+        for cluster_id, text in enumerate(texts):
+            if text:
+                lines.extend(label_metrics(text, cluster_id, seen_headers))
+        return web.Response(
+            body=("\n".join(lines) + "\n").encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    async def run(self):
+        self.session = aiohttp.ClientSession()
+        for cluster_id in range(len(self.groups)):
+            self.spawn(cluster_id)
+
+        app = web.Application()
+        app.router.add_get("/", self.home)
+        app.router.add_get("/healthz", self.live)
+        app.router.add_get("/readyz", self.ready)
+        app.router.add_get("/clusters", self.ready)
+        app.router.add_get("/metrics", self.metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, "0.0.0.0", STATUS_PORT).start()
+        log.info("Launcher status server running on port %d", STATUS_PORT)
+        try:
+            await self.supervise()
+        finally:
+            await self.stop()
+            await runner.cleanup()
+            await self.session.close()
+
+    async def stop(self):
+        self._stopping = True
+        for process in self.processes.values():
+            if process.is_alive():
+                # SIGINT deja que cada bot ejecute Seemu.close y vacíe su configuración.
+                if os.name == "nt":
+                    process.terminate()
+                else:
+                    os.kill(process.pid, signal.SIGINT)
+        for process in self.processes.values():
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+
+def main():
+    setup_logging()
+    install_event_loop()
+    if not TOKEN:
+        raise ValueError("TOKEN not found in environment variables")
+    shard_count = int(SHARD_COUNT) if SHARD_COUNT else asyncio.run(recommended_shards())
+    groups = shard_groups(shard_count, CLUSTER_COUNT)
+    log.info("%d shards across %d clusters", shard_count, len(groups))
+    launcher = Launcher(groups, shard_count)
+    try:
+        asyncio.run(launcher.run())
+    except KeyboardInterrupt:
+        log.info("Stopping clusters...")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method("spawn")
+    main()
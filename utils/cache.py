@@ -0,0 +1,85 @@
+import time
+from collections import OrderedDict
+
+from utils.runtime import dumps
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+def approx_size(value):
+    """Rough size in bytes of a JSON-compatible value, measured once on insert."""
+    return len(dumps(value))
+
+
+class TTLCache:
+    """In-memory LRU cache with a TTL, a stale-while-revalidate window and entry/byte caps."""
+
+    def __init__(self, ttl=60, stale_ttl=300, max_entries=512, max_bytes=4 * 1024 * 1024, sizeof=approx_size):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return ``(value, state)`` where state is FRESH, STALE or MISS."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, MISS
+
+        value, stored_at, _ = entry
+        age = time.monotonic() - stored_at
+        if age >= self.ttl + self.stale_ttl:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None, MISS
+
+        self._entries.move_to_end(key)
+        if age >= self.ttl:
+            self.stale_hits += 1
+            return value, STALE
+        self.hits += 1
+        return value, FRESH
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return value
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, time.monotonic(), size)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        return value
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,45 @@
+import heapq
+import math
+import time
+
+
+class CooldownStore:
+    """Per-command, per-user cooldowns on a monotonic clock with heap-based expiry."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._expires = {}
+        self._heap = []
+        self.rejections = 0
+
+    def __len__(self):
+        return len(self._expires)
+
+    def _purge(self, now):
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            if self._expires.get(key) == expires_at:
+                del self._expires[key]
+
+    def hit(self, command, user_id, window):
+        """Start the cooldown and return 0, or return the whole seconds still remaining."""
+        now = self.clock()
+        self._purge(now)
+        key = (command, user_id)
+        expires_at = self._expires.get(key)
+        if expires_at is not None:
+            self.rejections += 1
+            return math.ceil(expires_at - now)
+        if window > 0:
+            expires_at = now + window
+            self._expires[key] = expires_at
+            heapq.heappush(self._heap, (expires_at, key))
+        return 0
+
+    def reset(self, command, user_id):
+        self._expires.pop((command, user_id), None)
+
+    def stats(self):
+        self._purge(self.clock())
+        return {"active": len(self._expires), "rejections": self.rejections}
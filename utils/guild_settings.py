@@ -0,0 +1,259 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+GUILD_STORE = os.getenv("GUILD_STORE", "json").lower()
+GUILD_DB_PATH = os.getenv("GUILD_DB_PATH", "guild_settings.db")
+# Cada cuánto se comprueba si otro proceso del clúster cambió la base de datos.
+GUILD_DB_SYNC_INTERVAL = float(os.getenv("GUILD_DB_SYNC_INTERVAL", 5))
+
+# Archivos JSON que se importan una sola vez al crear la base de datos.
+LEGACY_CONFIGS = {
+    "like": ("like_channels.json", "like_channels", ("cooldown",)),
+    "info": ("info_channels.json", "info_channels", ("config", "cooldown")),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guild_channels (
+    command TEXT NOT NULL,
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    PRIMARY KEY (command, guild_id, channel_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS guild_limits (
+    command TEXT NOT NULL,
+    guild_id INTEGER NOT NULL,
+    cooldown INTEGER,
+    daily_limit INTEGER,
+    PRIMARY KEY (command, guild_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _lookup(config, path):
+    for key in path:
+        if not isinstance(config, dict):
+            return None
+        config = config.get(key)
+    return config
+
+
+class GuildSettings:
+    """Per-command channel allow-lists and limits with an int-keyed in-memory read cache.
+
+    ``persist_add`` and ``persist_remove`` are called with ``(guild_id, channel_id)`` after
+    each change to the cache; the storage backend passes its own writers.
+    """
+
+    def __init__(self, command, persist_add, persist_remove):
+        self.command = command
+        self._persist_add = persist_add
+        self._persist_remove = persist_remove
+        self._channels = {}
+        self._cooldowns = {}
+        self._daily_limits = {}
+
+    def has_guild(self, guild_id):
+        return guild_id in self._channels or guild_id in self._cooldowns
+
+    def channels(self, guild_id):
+        return self._channels.get(guild_id, frozenset())
+
+    def is_allowed(self, guild_id, channel_id):
+        allowed = self._channels.get(guild_id)
+        return not allowed or channel_id in allowed
+
+    def cooldown(self, guild_id, default):
+        return self._cooldowns.get(guild_id, default)
+
+    def daily_limit(self, guild_id, default):
+        return self._daily_limits.get(guild_id, default)
+
+    def add_channel(self, guild_id, channel_id):
+        allowed = self._channels.setdefault(guild_id, set())
+        if channel_id in allowed:
+            return False
+        allowed.add(channel_id)
+        self._persist_add(guild_id, channel_id)
+        return True
+
+    def remove_channel(self, guild_id, channel_id):
+        allowed = self._channels.get(guild_id)
+        if not allowed or channel_id not in allowed:
+            return False
+        allowed.discard(channel_id)
+        self._persist_remove(guild_id, channel_id)
+        return True
+
+
+class JsonGuildSettings(GuildSettings):
+    """GuildSettings backed by a cog's JSON config document and its JsonStore."""
+
+    def __init__(self, command, store, channels_key, cooldown_path, daily_limit_path=None):
+        super().__init__(command, self._json_add, self._json_remove)
+        self.store = store
+        self.channels_key = channels_key
+        for guild_id, server in store.data["servers"].items():
+            guild_id = int(guild_id)
+            self._channels[guild_id] = {int(channel_id) for channel_id in server.get(channels_key, [])}
+            cooldown = _lookup(server, cooldown_path)
+            if cooldown is not None:
+                self._cooldowns[guild_id] = cooldown
+            daily_limit = _lookup(server, daily_limit_path) if daily_limit_path else None
+            if daily_limit is not None:
+                self._daily_limits[guild_id] = daily_limit
+
+    def _server(self, guild_id):
+        server = self.store.data["servers"].setdefault(str(guild_id), {})
+        return server.setdefault(self.channels_key, [])
+
+    def _json_add(self, guild_id, channel_id):
+        self._server(guild_id).append(str(channel_id))
+        self.store.save()
+
+    def _json_remove(self, guild_id, channel_id):
+        self._server(guild_id).remove(str(channel_id))
+        self.store.save()
+
+
+class SqliteGuildSettings(GuildSettings):
+    """GuildSettings whose writes go to the shared SQLite database."""
+
+    def __init__(self, command, database):
+        super().__init__(command, self._sql_add, self._sql_remove)
+        self.database = database
+
+    def _sql_add(self, guild_id, channel_id):
+        self.database.execute(
+            "INSERT OR IGNORE INTO guild_channels (command, guild_id, channel_id) VALUES (?, ?, ?)",
+            (self.command, guild_id, channel_id),
+        )
+
+    def _sql_remove(self, guild_id, channel_id):
+        self.database.execute(
+            "DELETE FROM guild_channels WHERE command = ? AND guild_id = ? AND channel_id = ?",
+            (self.command, guild_id, channel_id),
+        )
+
+
+class GuildDatabase:
+    """SQLite (WAL) store for guild settings; writes run on one dedicated worker thread."""
+
+    def __init__(self, path=GUILD_DB_PATH):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="guild-db")
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        self._views = {}
+        self._sync_task = None
+        self.migrate()
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def migrate(self):
+        if self._conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+            return
+        with self._conn:
+            # IMMEDIATE: si varios procesos arrancan a la vez, solo uno migra.
+            self._conn.execute("BEGIN IMMEDIATE")
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+                return
+            for command, (path, channels_key, cooldown_path) in LEGACY_CONFIGS.items():
+                if not os.path.exists(path):
+                    continue
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        servers = json.load(f).get("servers", {})
+                except (json.JSONDecodeError, IOError) as e:
+                    log.warning("No se pudo migrar '%s': %s", path, e)
+                    continue
+                for guild_id, server in servers.items():
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO guild_channels (command, guild_id, channel_id) VALUES (?, ?, ?)",
+                        [(command, int(guild_id), int(channel_id)) for channel_id in server.get(channels_key, [])],
+                    )
+                    cooldown = _lookup(server, cooldown_path)
+                    daily_limit = _lookup(server, ("config", "daily_limit"))
+                    if cooldown is not None or daily_limit is not None:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO guild_limits (command, guild_id, cooldown, daily_limit) VALUES (?, ?, ?, ?)",
+                            (command, int(guild_id), cooldown, daily_limit),
+                        )
+                log.info("%s migrado a %s", path, self.path)
+            self._conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', '1')")
+
+    def _load(self, command):
+        channels, cooldowns, daily_limits = {}, {}, {}
+        for guild_id, channel_id in self._conn.execute(
+            "SELECT guild_id, channel_id FROM guild_channels WHERE command = ?", (command,)
+        ):
+            channels.setdefault(guild_id, set()).add(channel_id)
+        for guild_id, cooldown, daily_limit in self._conn.execute(
+            "SELECT guild_id, cooldown, daily_limit FROM guild_limits WHERE command = ?", (command,)
+        ):
+            if cooldown is not None:
+                cooldowns[guild_id] = cooldown
+            if daily_limit is not None:
+                daily_limits[guild_id] = daily_limit
+        return channels, cooldowns, daily_limits
+
+    def settings(self, command):
+        view = self._views.get(command)
+        if view is None:
+            view = self._views[command] = SqliteGuildSettings(command, self)
+            view._channels, view._cooldowns, view._daily_limits = self._load(command)
+        return view
+
+    def _reload_if_changed(self):
+        # data_version solo cambia cuando confirma otra conexión (otro proceso del clúster).
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return None
+        self._data_version = version
+        return {command: self._load(command) for command in self._views}
+
+    async def _sync(self, interval):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                reloaded = await loop.run_in_executor(self._executor, self._reload_if_changed)
+            except sqlite3.Error as e:
+                log.warning("Error al sincronizar la base de datos de servidores: %s", e)
+                continue
+            for command, (channels, cooldowns, daily_limits) in (reloaded or {}).items():
+                view = self._views[command]
+                view._channels, view._cooldowns, view._daily_limits = channels, cooldowns, daily_limits
+
+    def start_sync(self, interval=GUILD_DB_SYNC_INTERVAL):
+        if interval > 0:
+            self._sync_task = asyncio.ensure_future(self._sync(interval))
+
+    def execute(self, sql, params=()):
+        future = self._executor.submit(self._conn.execute, sql, params)
+        future.add_done_callback(self._report_error)
+        return future
+
+    @staticmethod
+    def _report_error(future):
+        if future.exception() is not None:
+            log.error("Error al escribir en la base de datos de servidores: %s", future.exception())
+
+    def stop_sync(self):
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+
+    def close(self):
+        self._executor.submit(self._conn.close)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,255 @@
+import asyncio
+import os
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from utils.latency import LatencyRecorder
+from utils.metrics import upstream_latency, upstream_total
+from utils.ratelimit import QuotaGovernor
+from utils.resilience import CircuitBreaker, backoff_delay
+from utils.runtime import loads
+from utils.singleflight import SingleFlight
+from utils.tracing import tracer
+
+POOL_LIMIT = int(os.getenv("UPSTREAM_POOL_LIMIT", 100))
+POOL_LIMIT_PER_HOST = int(os.getenv("UPSTREAM_POOL_LIMIT_PER_HOST", 20))
+DNS_CACHE_TTL = int(os.getenv("UPSTREAM_DNS_TTL", 300))
+KEEPALIVE_TIMEOUT = float(os.getenv("UPSTREAM_KEEPALIVE", 30))
+
+# (connect, read) en segundos para cada endpoint de las APIs externas.
+ENDPOINT_TIMEOUTS = {
+    "like": (5, 25),
+    "info": (5, 10),
+    "generate": (5, 15),
+}
+DEFAULT_TIMEOUT = (5, 15)
+
+# Solo los GET idempotentes se reintentan; /like nunca se repite.
+RETRYABLE_ENDPOINTS = {"info", "generate"}
+RETRY_ATTEMPTS = int(os.getenv("UPSTREAM_RETRY_ATTEMPTS", 3))
+RETRY_BACKOFF = float(os.getenv("UPSTREAM_RETRY_BACKOFF", 0.25))
+BREAKER_FAILURES = int(os.getenv("UPSTREAM_BREAKER_FAILURES", 5))
+BREAKER_RESET = float(os.getenv("UPSTREAM_BREAKER_RESET", 30))
+HEDGE_REQUESTS = os.getenv("UPSTREAM_HEDGE", "0") == "1"
+HEDGE_MIN_SAMPLES = 20
+
+
+def hosts_from_env(name, default):
+    """Comma-separated list of base URLs from ``name``, without trailing slashes."""
+    hosts = [host.strip().rstrip("/") for host in os.getenv(name, default).split(",")]
+    return [host for host in hosts if host]
+
+
+class UpstreamClient:
+    """Pooled aiohttp session shared by every cog for upstream API calls."""
+
+    def __init__(self, limit=POOL_LIMIT, limit_per_host=POOL_LIMIT_PER_HOST,
+                 dns_ttl=DNS_CACHE_TTL, keepalive=KEEPALIVE_TIMEOUT):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive = keepalive
+        self.session = None
+        self.flights = {}
+        self.governor = QuotaGovernor()
+        self.breakers = {}
+        self.latencies = {}
+        self.retries = 0
+        self.hedges = 0
+        self.short_circuits = 0
+        self._timeouts = {
+            name: aiohttp.ClientTimeout(sock_connect=connect, sock_read=read, total=connect + read)
+            for name, (connect, read) in ENDPOINT_TIMEOUTS.items()
+        }
+        self._default_timeout = aiohttp.ClientTimeout(
+            sock_connect=DEFAULT_TIMEOUT[0], sock_read=DEFAULT_TIMEOUT[1], total=sum(DEFAULT_TIMEOUT)
+        )
+
+    async def start(self):
+        # El conector debe crearse dentro del loop en ejecución.
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_ttl,
+            use_dns_cache=True,
+            keepalive_timeout=self.keepalive,
+        )
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self._default_timeout)
+
+    def timeout_for(self, endpoint):
+        return self._timeouts.get(endpoint, self._default_timeout)
+
+    def get(self, endpoint, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout_for(endpoint))
+        return self.session.get(url, **kwargs)
+
+    def budget_wait(self, urls, headers=None):
+        """Seconds until one of ``urls`` has request budget (0 = now); spends nothing."""
+        return min(self.governor.wait_for(url, headers) for url in urls)
+
+    def blocked_for(self, urls, headers=None):
+        """Seconds until one of ``urls`` is out of its Retry-After block (0 = one is not blocked)."""
+        return min(self.governor.blocked_for(url, headers) for url in urls)
+
+    def check_budget(self, urls, headers=None):
+        """Like ``budget_wait``, but a non-zero answer counts as a local rejection."""
+        wait = self.budget_wait(urls, headers)
+        if wait > 0:
+            self.governor.reject(urls, headers)
+        return wait
+
+    def breaker(self, url):
+        host = urlsplit(url).netloc
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET)
+        return breaker
+
+    def latency(self, endpoint):
+        recorder = self.latencies.get(endpoint)
+        if recorder is None:
+            recorder = self.latencies[endpoint] = LatencyRecorder()
+        return recorder
+
+    def _pick(self, urls, offset, exclude=None, headers=None):
+        # Primer host (rotando desde ``offset``) con presupuesto y cuyo circuito deja pasar la petición;
+        # la petición se cobra al host elegido, no al primero de la lista.
+        for i in range(len(urls)):
+            url = urls[(offset + i) % len(urls)]
+            if url != exclude and self.governor.wait_for(url, headers) <= 0 and self.breaker(url).allow():
+                self.governor.acquire(url, headers)
+                return url
+        return None
+
+    async def _attempt(self, endpoint, url, read, **kwargs):
+        breaker = self.breaker(url)
+        trace = tracer.current()
+        started = time.perf_counter()
+        try:
+            async with self.get(endpoint, url, **kwargs) as response:
+                headers_at = time.perf_counter()
+                status = response.status
+                if status == 429:
+                    self.governor.throttle(url, response.headers.get("Retry-After"), kwargs.get("headers"))
+                if status != 200:
+                    body = await response.text()
+                elif read == "json":
+                    body = await response.json(loads=loads)
+                else:
+                    body = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            breaker.record_failure()
+            upstream_total.inc(endpoint, "error")
+            raise
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            # Cuerpo ilegible (JSON mal formado, etc.): cuenta como fallo del host y libera la sonda semiabierta.
+            breaker.record_failure()
+            upstream_total.inc(endpoint, "invalid")
+            raise
+        elapsed = time.perf_counter() - started
+        if trace is not None:
+            # Cabeceras recibidas vs. cuerpo leído y decodificado.
+            trace.add(f"{endpoint}_http", started, headers_at)
+            trace.add(f"{endpoint}_read", headers_at, started + elapsed)
+        upstream_total.inc(endpoint, status)
+        upstream_latency.observe(elapsed, endpoint)
+        if status >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            self.latency(endpoint).record(elapsed)
+        return status, body
+
+    async def _hedged(self, endpoint, urls, url, read, **kwargs):
+        primary = asyncio.ensure_future(self._attempt(endpoint, url, read, **kwargs))
+        recorder = self.latency(endpoint)
+        if len(recorder.samples) < HEDGE_MIN_SAMPLES:
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=recorder.percentile(95))
+        backup_url = None if done else self._pick(urls, urls.index(url) + 1, exclude=url, headers=kwargs.get("headers"))
+        if backup_url is None:
+            return await primary
+
+        self.hedges += 1
+        pending = {primary, asyncio.ensure_future(self._attempt(endpoint, backup_url, read, **kwargs))}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result()[0] < 500:
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _fetch(self, endpoint, urls, read, **kwargs):
+        attempts = RETRY_ATTEMPTS if endpoint in RETRYABLE_ENDPOINTS else 1
+        result = None
+        error = None
+        for attempt in range(attempts):
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(backoff_delay(attempt, RETRY_BACKOFF))
+            url = self._pick(urls, attempt, headers=kwargs.get("headers"))
+            if url is None:
+                break
+            try:
+                if HEDGE_REQUESTS and endpoint in RETRYABLE_ENDPOINTS and len(urls) > 1:
+                    result = await self._hedged(endpoint, urls, url, read, **kwargs)
+                else:
+                    result = await self._attempt(endpoint, url, read, **kwargs)
+                error = None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                result, error = None, e
+                continue
+            if result[0] < 500 and result[0] != 429:
+                return result
+        if error is not None:
+            raise error
+        if result is not None:
+            return result
+        # Todos los circuitos abiertos o sin presupuesto (propio o Retry-After): se falla rápido sin llamar.
+        if self.check_budget(urls, kwargs.get("headers")) > 0:
+            return 429, "Sin presupuesto"
+        self.short_circuits += 1
+        return 503, "Circuito abierto"
+
+    async def fetch(self, endpoint, urls, key, read="json", **kwargs):
+        """GET one of ``urls`` (failover order) and return ``(status, body)``.
+
+        Callers sharing ``key`` share one request.
+        """
+        if isinstance(urls, str):
+            urls = [urls]
+        flight = self.flights.get(endpoint)
+        if flight is None:
+            flight = self.flights[endpoint] = SingleFlight()
+        return await flight.do(key, lambda: self._fetch(endpoint, urls, read, **kwargs))
+
+    def breaker_stats(self):
+        return {
+            host: {"state": breaker.state, "failures": breaker.failures, "opens": breaker.opens}
+            for host, breaker in self.breakers.items()
+        }
+
+    def coalesce_stats(self):
+        return {endpoint: flight.stats() for endpoint, flight in self.flights.items()}
+
+    def pool_stats(self):
+        if self.session is None or self.session.closed:
+            return {"open": 0, "idle": 0, "in_use": 0, "waiting": 0}
+        connector = self.session.connector
+        idle = sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+        in_use = len(getattr(connector, "_acquired", ()))
+        waiting = sum(len(waiters) for waiters in getattr(connector, "_waiters", {}).values())
+        return {"open": idle + in_use, "idle": idle, "in_use": in_use, "waiting": waiting}
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
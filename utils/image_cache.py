@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+from utils.metrics import image_cache_bytes_saved, image_cache_requests
+from utils.persistence import JsonStore, cluster_path
+from utils.runtime import loads
+
+log = logging.getLogger(__name__)
+
+# Un directorio por proceso del clúster: al arrancar se borran los archivos que no están en el índice propio.
+IMAGE_CACHE_DIR = os.getenv("INFO_IMAGE_CACHE_DIR", cluster_path("image_cache"))
+IMAGE_CACHE_TTL = int(os.getenv("INFO_IMAGE_CACHE_TTL", 1800))
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("INFO_IMAGE_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+# El índice se reescribe como mucho una vez cada este número de segundos.
+IMAGE_CACHE_INDEX_FLUSH = float(os.getenv("INFO_IMAGE_CACHE_INDEX_FLUSH", 10))
+
+
+class DiskImageCache:
+    """Content-addressed image files on disk, indexed by key, with a TTL and an LRU size cap.
+
+    The index lives in memory (least recently used first) and is persisted with a
+    JsonStore; files are named by the SHA-256 of their content, so identical images
+    stored under several keys share one file.
+    """
+
+    def __init__(self, directory=IMAGE_CACHE_DIR, ttl=IMAGE_CACHE_TTL, max_bytes=IMAGE_CACHE_MAX_BYTES,
+                 flush_delay=IMAGE_CACHE_INDEX_FLUSH, clock=time.time):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        os.makedirs(directory, exist_ok=True)
+        index_path = os.path.join(directory, "index.json")
+        self.store = JsonStore(index_path, {"entries": {}}, debounce=flush_delay)
+        self._entries = OrderedDict()
+        self._refs = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._load(index_path)
+
+    def path_for(self, digest):
+        return os.path.join(self.directory, digest + ".png")
+
+    def _load(self, index_path):
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                entries = loads(f.read()).get("entries", {})
+        except FileNotFoundError:
+            entries = {}
+        except (json.JSONDecodeError, IOError) as e:
+            log.warning("Índice de imágenes ilegible, se reconstruye: %s", e)
+            entries = {}
+        now = self.clock()
+        # Se recorren por último uso, así el orden LRU sobrevive al reinicio.
+        for key, entry in sorted(entries.items(), key=lambda item: item[1][3]):
+            if now - entry[2] < self.ttl and os.path.exists(self.path_for(entry[0])):
+                self._add(key, entry)
+        for name in os.listdir(self.directory):
+            digest, ext = os.path.splitext(name)
+            if ext == ".png" and digest not in self._refs:
+                self._unlink(digest)
+        # Sin loop todavía: la limpieza se escribe con el siguiente guardado o al cerrar.
+        self.store.dirty = len(self._entries) != len(entries)
+
+    def _add(self, key, entry):
+        # entry = [digest, tamaño, guardado, último uso]; la misma lista está en el índice persistido.
+        digest, size = entry[0], entry[1]
+        self._entries[key] = entry
+        self.store.data["entries"][key] = entry
+        if digest not in self._refs:
+            self._refs[digest] = 0
+            self.bytes += size
+        self._refs[digest] += 1
+
+    def _remove(self, key):
+        digest, size = self._entries.pop(key)[:2]
+        del self.store.data["entries"][key]
+        self._refs[digest] -= 1
+        if not self._refs[digest]:
+            del self._refs[digest]
+            self.bytes -= size
+            self._unlink(digest)
+
+    def _unlink(self, digest):
+        try:
+            os.remove(self.path_for(digest))
+        except OSError:
+            pass
+
+    def get(self, key):
+        """Path of the cached image for ``key``, or None on a miss or an expired entry."""
+        now = self.clock()
+        entry = self._entries.get(key)
+        if entry is not None and now - entry[2] >= self.ttl:
+            self._remove(key)
+            self.store.save()
+            entry = None
+        if entry is None:
+            self.misses += 1
+            image_cache_requests.inc("miss")
+            return None
+        self._entries.move_to_end(key)
+        entry[3] = now
+        self.store.save()
+        self.hits += 1
+        self.bytes_saved += entry[1]
+        image_cache_requests.inc("hit")
+        image_cache_bytes_saved.inc(amount=entry[1])
+        return self.path_for(entry[0])
+
+    async def put(self, key, data):
+        """Store ``data`` for ``key`` and return its path; the file is written off the loop."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        now = self.clock()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == digest:
+            # Misma imagen: solo se renueva la entrada.
+            entry[2] = entry[3] = now
+            self._entries.move_to_end(key)
+            self.store.save()
+            return path
+        if entry is not None:
+            self._remove(key)
+        if digest not in self._refs:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, path, data)
+        if key in self._entries:
+            self._remove(key)
+        self._add(key, [digest, len(data), now, now])
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            self._remove(next(iter(self._entries)))
+        self.store.save()
+        return path
+
+    @staticmethod
+    def _write(path, data):
+        temp_file = path + ".tmp"
+        with open(temp_file, "wb") as f:
+            f.write(data)
+        os.replace(temp_file, path)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "files": len(self._refs),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+        }
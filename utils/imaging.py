@@ -0,0 +1,129 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.metrics import image_optimize_bytes, image_optimize_seconds, image_optimize_total
+
+log = logging.getLogger(__name__)
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow es opcional: sin él las imágenes se suben tal cual.
+    Image = None
+
+IMAGE_OPTIMIZE = os.getenv("INFO_IMAGE_OPTIMIZE", "0") == "1"
+IMAGE_FORMAT = os.getenv("INFO_IMAGE_FORMAT", "webp").lower()
+IMAGE_MAX_DIMENSION = int(os.getenv("INFO_IMAGE_MAX_DIMENSION", 1024))
+IMAGE_QUALITY = int(os.getenv("INFO_IMAGE_QUALITY", 80))
+IMAGE_WORKERS = int(os.getenv("INFO_IMAGE_WORKERS", 2))
+IMAGE_ENCODE_TIMEOUT = float(os.getenv("INFO_IMAGE_ENCODE_TIMEOUT", 3))
+
+
+def image_extension(head):
+    """File extension for the image whose first bytes are ``head``."""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[:3] == b"\xff\xd8\xff":
+        return ".jpg"
+    return ".png"
+
+
+def encode_image(data, fmt, max_dimension, quality):
+    """Downsize and re-encode ``data``; runs in a worker process."""
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        if max_dimension and max(image.size) > max_dimension:
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+        out = io.BytesIO()
+        if fmt == "webp":
+            image.save(out, format="WEBP", quality=quality, method=4)
+        else:
+            if image.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+                image = image.convert("RGBA")
+            image.save(out, format="PNG", optimize=True)
+        return out.getvalue()
+
+
+def _warm_up():
+    return True
+
+
+class ImageOptimizer:
+    """Re-encodes images in a bounded process pool, falling back to the original bytes."""
+
+    def __init__(self, workers=IMAGE_WORKERS, fmt=IMAGE_FORMAT, max_dimension=IMAGE_MAX_DIMENSION,
+                 quality=IMAGE_QUALITY, timeout=IMAGE_ENCODE_TIMEOUT):
+        self.workers = max(1, workers)
+        self.fmt = fmt
+        self.max_dimension = max_dimension
+        self.quality = quality
+        self.timeout = timeout
+        self.in_flight = 0
+        self._pool = None
+
+    def start(self):
+        # spawn: los procesos no heredan el loop ni los sockets del bot.
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self._pool.submit(_warm_up)
+
+    async def optimize(self, data):
+        """Smaller encoding of ``data``, or ``data`` itself on timeout, error, overload or no gain."""
+        if self._pool is None:
+            return data
+        # Como mucho un trabajo en cola por proceso; si no, se sube la original sin esperar.
+        if self.in_flight >= self.workers * 2:
+            image_optimize_total.inc("busy")
+            return data
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        job = asyncio.get_running_loop().run_in_executor(
+            self._pool, encode_image, data, self.fmt, self.max_dimension, self.quality
+        )
+        # Un trabajo que ya corre en el proceso no se puede cancelar: sigue ocupando su hueco hasta
+        # que termina de verdad, aunque esta petición deje de esperarlo por el timeout.
+        job.add_done_callback(self._job_done)
+        try:
+            encoded = await asyncio.wait_for(asyncio.shield(job), self.timeout)
+        except asyncio.TimeoutError:
+            image_optimize_total.inc("timeout")
+            return data
+        except Exception as e:
+            log.warning("No se pudo optimizar la imagen: %s", e)
+            image_optimize_total.inc("error")
+            return data
+
+        image_optimize_seconds.observe(time.perf_counter() - started)
+        image_optimize_bytes.inc("in", amount=len(data))
+        if len(encoded) >= len(data):
+            image_optimize_bytes.inc("out", amount=len(data))
+            image_optimize_total.inc("larger")
+            return data
+        image_optimize_bytes.inc("out", amount=len(encoded))
+        image_optimize_total.inc("optimized")
+        return encoded
+
+    def _job_done(self, job):
+        self.in_flight -= 1
+        if not job.cancelled():
+            # Marca la excepción de un trabajo abandonado como recuperada.
+            job.exception()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def create_optimizer():
+    """The optimizer if INFO_IMAGE_OPTIMIZE is on and Pillow is installed, else None."""
+    if not IMAGE_OPTIMIZE:
+        return None
+    if Image is None:
+        log.warning("INFO_IMAGE_OPTIMIZE=1 requires Pillow (pip install Pillow); images are uploaded unchanged")
+        return None
+    return ImageOptimizer()
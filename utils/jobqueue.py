@@ -0,0 +1,128 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.metrics import job_total, job_wait
+from utils.persistence import cluster_path
+
+log = logging.getLogger(__name__)
+
+LIKE_QUEUE_WORKERS = int(os.getenv("LIKE_QUEUE_WORKERS", 4))
+# Cada proceso del clúster tiene su propia cola: sus trabajos solo los entrega él.
+LIKE_QUEUE_PATH = os.getenv("LIKE_QUEUE_PATH", cluster_path("like_jobs", ".db"))
+# Al apagar se espera a que terminen los trabajos en curso como mucho este tiempo.
+QUEUE_DRAIN_TIMEOUT = float(os.getenv("QUEUE_DRAIN_TIMEOUT", 10))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending'
+);
+"""
+
+
+class JobQueue:
+    """Durable FIFO of JSON jobs in SQLite, drained by a fixed pool of asyncio workers.
+
+    A job is committed to disk before ``enqueue`` returns and deleted once ``handler``
+    finishes, so jobs pending or running when the process stops run again on the next
+    ``start``.
+    """
+
+    def __init__(self, name, handler, path, workers=LIKE_QUEUE_WORKERS, clock=time.time):
+        self.name = name
+        self.handler = handler
+        self.path = path
+        self.workers = max(1, workers)
+        self.clock = clock
+        self.busy = 0
+        self.resumed = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-queue")
+        self._conn = None
+        self._pending = asyncio.Queue()
+        self._tasks = []
+        self._closing = False
+
+    def _open(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # Lo que quedó a medias en el apagado anterior se vuelve a ejecutar.
+        self._conn.execute("UPDATE jobs SET state = 'pending' WHERE state = 'running'")
+        return self._conn.execute("SELECT id, payload, created_at FROM jobs ORDER BY id").fetchall()
+
+    async def _db(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def start(self):
+        rows = await self._db(self._open)
+        for job_id, payload, created_at in rows:
+            self._pending.put_nowait((job_id, json.loads(payload), created_at))
+        self.resumed = len(rows)
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        if rows:
+            log.info("%d %s jobs resumed from %s", len(rows), self.name, self.path)
+
+    def _insert(self, payload, created_at):
+        return self._conn.execute(
+            "INSERT INTO jobs (payload, created_at) VALUES (?, ?)", (payload, created_at)
+        ).lastrowid
+
+    async def enqueue(self, payload):
+        """Persist ``payload`` and return ``(job_id, position)``; position 1 is the next to run."""
+        created_at = self.clock()
+        job_id = await self._db(self._insert, json.dumps(payload), created_at)
+        self._pending.put_nowait((job_id, payload, created_at))
+        return job_id, self._pending.qsize()
+
+    async def _worker(self):
+        while not self._closing:
+            job = await self._pending.get()
+            self.busy += 1
+            try:
+                await self._run(*job)
+            finally:
+                self.busy -= 1
+
+    async def _run(self, job_id, payload, created_at):
+        job_wait.observe(max(0.0, self.clock() - created_at), self.name)
+        await self._db(self._conn.execute, "UPDATE jobs SET state = 'running' WHERE id = ?", (job_id,))
+        try:
+            await self.handler(payload)
+            job_total.inc(self.name, "done")
+        except Exception as e:
+            log.exception("Error en el trabajo %s #%s: %s", self.name, job_id, e, extra={"job": job_id})
+            job_total.inc(self.name, "failed")
+        # Un trabajo cancelado no llega aquí: sigue en disco y se reanuda en el próximo arranque.
+        await self._db(self._conn.execute, "DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def stats(self):
+        return {
+            "pending": self._pending.qsize(),
+            "busy": self.busy,
+            "workers": self.workers,
+            "utilization": self.busy / self.workers,
+            "resumed": self.resumed,
+        }
+
+    async def close(self, timeout=QUEUE_DRAIN_TIMEOUT):
+        if self._closing:
+            return
+        self._closing = True
+        # Los trabajos en curso tienen ``timeout`` para terminar; los pendientes esperan en disco.
+        deadline = time.monotonic() + timeout
+        while self.busy and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._conn is not None:
+            await self._db(self._conn.close)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,23 @@
+from collections import deque
+
+
+class LatencyRecorder:
+    """Keeps the most recent latency samples (seconds) and reports percentiles over them."""
+
+    def __init__(self, size=1024):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self):
+        return {"p50": self.percentile(50), "p95": self.percentile(95), "p99": self.percentile(99)}
@@ -0,0 +1,137 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# json: una línea JSON por evento (para el agregador de logs); text: legible en consola.
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# Cada mensaje WARNING o superior se escribe como mucho LOG_RATE_BURST veces por ventana.
+LOG_RATE_WINDOW = float(os.getenv("LOG_RATE_WINDOW", 60))
+LOG_RATE_BURST = int(os.getenv("LOG_RATE_BURST", 5))
+
+# Campos que los módulos pasan con ``extra=`` y que se copian tal cual a la línea JSON.
+CONTEXT_FIELDS = ("guild", "command", "uid", "status", "latency_ms", "endpoint", "host", "job", "cluster", "suppressed")
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, context fields and traceback."""
+
+    def __init__(self, cluster=None):
+        super().__init__()
+        self.cluster = cluster
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if self.cluster is not None:
+            entry["cluster"] = self.cluster
+        for field in CONTEXT_FIELDS:
+            value = record.__dict__.get(field)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S")
+
+    def format(self, record):
+        line = super().format(record)
+        context = " ".join(
+            f"{field}={record.__dict__[field]}" for field in CONTEXT_FIELDS if record.__dict__.get(field) is not None
+        )
+        return f"{line} [{context}]" if context else line
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets each repeated warning or error through ``burst`` times per ``window`` seconds.
+
+    Repeats are keyed by logger, level and the unformatted message, so the same error
+    for different UIDs counts as one message. The next record let through after a
+    suppressed run carries ``suppressed=<count>``.
+    """
+
+    def __init__(self, window=LOG_RATE_WINDOW, burst=LOG_RATE_BURST, clock=time.monotonic):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.clock = clock
+        self._seen = {}
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING or self.burst <= 0:
+            return True
+        key = (record.name, record.levelno, record.msg)
+        now = self.clock()
+        state = self._seen.get(key)
+        if state is None or now - state[0] >= self.window:
+            suppressed = state[2] if state else 0
+            self._seen[key] = [now, 1, 0]
+            if suppressed:
+                record.suppressed = suppressed
+            if len(self._seen) > 1024:
+                self._seen = {k: v for k, v in self._seen.items() if now - v[0] < self.window}
+            return True
+        if state[1] < self.burst:
+            state[1] += 1
+            return True
+        state[2] += 1
+        return False
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Solo se resuelve el mensaje (y la traza, que no se puede enviar entre hilos);
+        # el formateo JSON y la escritura los hace el hilo del listener.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, stream=None):
+    """Route every logger through a queue to a background thread that formats and writes."""
+    global _listener
+    if _listener is not None:
+        return
+    output = logging.StreamHandler(stream or sys.stdout)
+    # CLUSTER_ID se lee aquí y no al importar: con "spawn" los procesos del clúster importan este
+    # módulo (vía launcher.py) antes de que run_cluster fije la variable.
+    cluster = os.getenv("CLUSTER_ID")
+    cluster = int(cluster) if cluster is not None else None
+    output.setFormatter(JsonFormatter(cluster) if fmt == "json" else TextFormatter())
+    handler = _QueueHandler(queue.SimpleQueue())
+    handler.addFilter(RateLimitFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
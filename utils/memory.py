@@ -0,0 +1,99 @@
+import asyncio
+import gc
+import logging
+import os
+import sys
+import tracemalloc
+
+log = logging.getLogger(__name__)
+
+# Umbrales del GC por generación; los valores por defecto de CPython son 700,10,10.
+GC_THRESHOLDS = os.getenv("GC_THRESHOLDS", "7000,20,20")
+MEMORY_REPORT_INTERVAL = float(os.getenv("MEMORY_REPORT_INTERVAL", 300))
+MEMORY_TRACE = os.getenv("MEMORY_TRACE", "0") == "1"
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", 5))
+
+
+def tune_gc():
+    thresholds = tuple(int(value) for value in GC_THRESHOLDS.split(","))
+    gc.set_threshold(*thresholds)
+    if MEMORY_TRACE:
+        tracemalloc.start(MEMORY_TRACE_FRAMES)
+
+
+def freeze_heap():
+    """Move everything allocated during startup to the permanent generation."""
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss es el pico, en KiB en Linux y en bytes en macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryReporter:
+    """Periodically samples RSS and the GC object count, and diffs tracemalloc snapshots on demand."""
+
+    def __init__(self, interval=MEMORY_REPORT_INTERVAL):
+        self.interval = interval
+        self.rss = rss_bytes()
+        self.objects = None
+        self._baseline = None
+        self._task = None
+
+    def start(self):
+        if self.interval > 0:
+            self._task = asyncio.ensure_future(self._run())
+
+    def sample(self):
+        self.rss = rss_bytes()
+        # get_objects() no incluye la generación permanente creada por gc.freeze().
+        self.objects = len(gc.get_objects()) + gc.get_freeze_count()
+        return self.rss, self.objects
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            rss, objects = self.sample()
+            rss_mb = f"{rss / 1024 / 1024:.1f} MB" if rss is not None else "?"
+            log.info("Memoria: RSS %s, %d objetos, congelados %d", rss_mb, objects, gc.get_freeze_count())
+
+    def gc_collections(self):
+        return {str(generation): stats["collections"] for generation, stats in enumerate(gc.get_stats())}
+
+    def _snapshot_diff(self, limit):
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        if self._baseline is None:
+            self._baseline = snapshot
+            stats = snapshot.statistics("lineno")[:limit]
+            header = "Primera instantánea (línea base); vuelve a consultar para ver el diff."
+        else:
+            stats = snapshot.compare_to(self._baseline, "lineno")[:limit]
+            header = "Diferencia respecto a la instantánea anterior:"
+            self._baseline = snapshot
+        return "\n".join([header] + [str(stat) for stat in stats])
+
+    async def snapshot_diff(self, limit=25):
+        if not tracemalloc.is_tracing():
+            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._snapshot_diff, limit)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
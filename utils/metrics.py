@@ -0,0 +1,172 @@
+import asyncio
+import math
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{str(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format(value):
+    if value is None:
+        return "NaN"
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class Counter:
+    """Monotonic counter; only the event loop writes, so no locking is needed."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.values = {}
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in list(self.values.items()):
+            yield self.name, labels, value
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect plus two additions."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.values = {}
+
+    def observe(self, value, *labels):
+        state = self.values.get(labels)
+        if state is None:
+            state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def samples(self):
+        for labels, (counts, total) in list(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), list(counts)):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket", labels + (le,), cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Gauge:
+    """Gauge whose samples are produced by a callback when /metrics is scraped."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=(), callback=None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.callback = callback
+
+    def samples(self):
+        if self.callback is None:
+            return
+        value = self.callback()
+        if isinstance(value, dict):
+            for labels, sample in value.items():
+                yield self.name, labels if isinstance(labels, tuple) else (labels,), sample
+        else:
+            yield self.name, (), value
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge(self, name, help_text, labelnames=(), callback=None):
+        return self.register(Gauge(name, help_text, labelnames, callback))
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in list(self.metrics):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            names = metric.labelnames + (("le",) if metric.kind == "histogram" else ())
+            try:
+                for name, labels, value in metric.samples():
+                    label_names = names if name.endswith("_bucket") else metric.labelnames
+                    lines.append(f"{name}{_labels(label_names, labels)} {_format(value)}")
+            except Exception as e:
+                lines.append(f"# error collecting {metric.name}: {e}")
+        return "\n".join(lines) + "\n"
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from a fixed sleep."""
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, time.perf_counter() - started - self.interval)
+            self.max_lag = max(self.max_lag, self.lag)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+metrics = Registry()
+
+command_total = metrics.counter("bot_commands_total", "Commands invoked, by command and outcome.", ("command", "outcome"))
+command_latency = metrics.histogram("bot_command_latency_seconds", "End-to-end command latency.", ("command",))
+upstream_total = metrics.counter("bot_upstream_requests_total", "Upstream HTTP requests, by endpoint and status.", ("endpoint", "status"))
+upstream_latency = metrics.histogram("bot_upstream_latency_seconds", "Upstream HTTP request latency.", ("endpoint",))
+cooldown_rejections = metrics.counter("bot_cooldown_rejections_total", "Commands rejected by the user cooldown.", ("command",))
+channel_rejections = metrics.counter("bot_channel_rejections_total", "Commands rejected by the channel allow-list.", ("command",))
+quota_rejections = metrics.counter("bot_quota_rejections_total", "Commands rejected by the guild's daily quota.", ("command",))
+image_cache_requests = metrics.counter("bot_image_cache_requests_total", "Outfit image cache lookups, by result.", ("result",))
+image_cache_bytes_saved = metrics.counter("bot_image_cache_bytes_saved_total", "Image bytes served from disk instead of downloaded.")
+image_optimize_total = metrics.counter("bot_image_optimize_total", "Outfit image re-encodes, by outcome.", ("outcome",))
+image_optimize_bytes = metrics.counter("bot_image_optimize_bytes_total", "Outfit image bytes before and after re-encoding.", ("direction",))
+image_optimize_seconds = metrics.histogram("bot_image_optimize_seconds", "Outfit image re-encode time, queueing included.")
+job_total = metrics.counter("bot_jobs_total", "Queued jobs finished, by queue and outcome.", ("queue", "outcome"))
+job_wait = metrics.histogram("bot_job_wait_seconds", "Time a queued job waited for a worker.", ("queue",))
+negative_cache_hits = metrics.counter("bot_like_negative_cache_hits_total", "Like requests answered from the negative cache (upstream calls saved).", ("kind",))
+loop_blocks = metrics.counter("bot_event_loop_blocks_total", "Times the event loop was blocked longer than LOOP_BLOCK_THRESHOLD.")
@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+from utils.metrics import negative_cache_hits
+from utils.persistence import JsonStore, cluster_path
+from utils.runtime import loads
+
+log = logging.getLogger(__name__)
+
+EXHAUSTED = 1
+NOT_FOUND = 2
+KIND_NAMES = {EXHAUSTED: "exhausted", NOT_FOUND: "not_found"}
+
+# Hora UTC a la que la API de likes vuelve a aceptar un UID que ya llegó al máximo.
+LIKE_RESET_HOUR = int(os.getenv("LIKE_RESET_HOUR", 0))
+NOT_FOUND_TTL = int(os.getenv("LIKE_NOT_FOUND_TTL", 30 * 60))
+NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv("LIKE_NEGATIVE_CACHE_MAX_ENTRIES", 50_000))
+NEGATIVE_CACHE_FLUSH = float(os.getenv("LIKE_NEGATIVE_CACHE_FLUSH", 30))
+NEGATIVE_CACHE_PATH = os.getenv("LIKE_NEGATIVE_CACHE_PATH", cluster_path("like_negative_cache", ".json"))
+
+DAY = 86400
+
+
+class NegativeCache:
+    """UIDs whose like request is known to fail: exhausted until the daily reset, or not found for a while.
+
+    Entries are ``uid -> (kind, expires_at)`` in insertion order; once ``max_entries``
+    is reached the oldest entry is dropped.
+    """
+
+    def __init__(self, path=NEGATIVE_CACHE_PATH, max_entries=NEGATIVE_CACHE_MAX_ENTRIES,
+                 not_found_ttl=NOT_FOUND_TTL, reset_hour=LIKE_RESET_HOUR, flush_delay=NEGATIVE_CACHE_FLUSH,
+                 clock=time.time):
+        self.max_entries = max_entries
+        self.not_found_ttl = not_found_ttl
+        self.reset_offset = reset_hour * 3600
+        self.clock = clock
+        self.saved = 0
+        self._entries = OrderedDict()
+        self.store = JsonStore(path, {"entries": {}}, debounce=flush_delay)
+        self._load(path)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _load(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = loads(f.read()).get("entries", {})
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, IOError) as e:
+            log.warning("No se pudo cargar '%s': %s", path, e)
+            return
+        now = self.clock()
+        for uid, (kind, expires_at) in entries.items():
+            if expires_at > now:
+                self._entries[int(uid)] = (kind, expires_at)
+        self.store.data["entries"] = self._entries
+
+    def next_reset(self, now):
+        return ((now - self.reset_offset) // DAY + 1) * DAY + self.reset_offset
+
+    def get(self, uid):
+        """EXHAUSTED or NOT_FOUND if ``uid`` is known to fail right now, else None."""
+        uid = int(uid)
+        entry = self._entries.get(uid)
+        if entry is None:
+            return None
+        kind, expires_at = entry
+        if expires_at <= self.clock():
+            del self._entries[uid]
+            self.store.save()
+            return None
+        self.saved += 1
+        negative_cache_hits.inc(KIND_NAMES[kind])
+        return kind
+
+    def _put(self, uid, kind, expires_at):
+        uid = int(uid)
+        self._entries.pop(uid, None)
+        self._entries[uid] = (kind, expires_at)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.store.data["entries"] = self._entries
+        self.store.save()
+
+    def mark_exhausted(self, uid):
+        self._put(uid, EXHAUSTED, self.next_reset(self.clock()))
+
+    def mark_not_found(self, uid):
+        self._put(uid, NOT_FOUND, self.clock() + self.not_found_ttl)
+
+    def stats(self):
+        counts = {name: 0 for name in KIND_NAMES.values()}
+        for kind, _ in self._entries.values():
+            counts[KIND_NAMES[kind]] += 1
+        return {"entries": len(self._entries), "saved": self.saved, **counts}
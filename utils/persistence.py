@@ -0,0 +1,72 @@
+import asyncio
+import json
+import logging
+import os
+
+from utils.runtime import dumps, loads
+
+log = logging.getLogger(__name__)
+
+CONFIG_FLUSH_DELAY = float(os.getenv("CONFIG_FLUSH_DELAY", 2))
+
+
+def cluster_path(base, ext=""):
+    """``base + ext``, or ``base.<CLUSTER_ID> + ext`` inside a cluster process so each one has its own file."""
+    cluster = os.getenv("CLUSTER_ID")
+    return f"{base}.{cluster}{ext}" if cluster is not None else f"{base}{ext}"
+
+
+class JsonStore:
+    """Keeps a JSON document in memory and flushes changes atomically from a worker thread."""
+
+    def __init__(self, path, data, debounce=CONFIG_FLUSH_DELAY, ensure_ascii=True):
+        self.path = path
+        self.data = data
+        self.debounce = debounce
+        self.ensure_ascii = ensure_ascii
+        self.dirty = False
+        self.flushes = 0
+        self._timer = None
+        self._task = None
+        self._lock = asyncio.Lock()
+
+    def save(self):
+        """Mark the document dirty; bursts of changes are written once after ``debounce`` seconds."""
+        self.dirty = True
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.debounce, self._start_flush)
+
+    def _start_flush(self):
+        self._timer = None
+        self._task = asyncio.ensure_future(self.flush())
+
+    async def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:
+            if not self.dirty:
+                return
+            self.dirty = False
+            # Instantánea compacta con el codificador en C; el formateo y la escritura van al hilo.
+            snapshot = dumps(self.data)
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(None, self._write, snapshot)
+                self.flushes += 1
+            except OSError as e:
+                self.dirty = True
+                log.error("Error al guardar '%s': %s", self.path, e)
+
+    def _write(self, snapshot):
+        temp_file = self.path + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(loads(snapshot), f, indent=4, ensure_ascii=self.ensure_ascii)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.path)
+
+    async def close(self):
+        if self._task is not None and not self._task.done():
+            await self._task
+        await self.flush()
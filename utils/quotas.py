@@ -0,0 +1,108 @@
+import json
+import logging
+import os
+import time
+
+from utils.persistence import JsonStore, cluster_path
+from utils.runtime import loads
+
+log = logging.getLogger(__name__)
+
+# Hora UTC (0-23) a la que se reinician los contadores diarios.
+QUOTA_RESET_HOUR = int(os.getenv("QUOTA_RESET_HOUR", 0))
+# Los contadores viven en memoria; se escriben a disco como mucho una vez por intervalo.
+QUOTA_CHECKPOINT_INTERVAL = float(os.getenv("QUOTA_CHECKPOINT_INTERVAL", 60))
+# Cada proceso del clúster atiende a sus propios servidores y guarda su propio archivo.
+QUOTA_STATE_PATH = os.getenv("QUOTA_STATE_PATH", cluster_path("guild_quotas", ".json"))
+SUBSCRIBED_GUILDS = frozenset(
+    int(guild_id) for guild_id in os.getenv("SUBSCRIBED_GUILDS", "").split(",") if guild_id.strip()
+)
+
+DAY = 86400
+
+
+class QuotaEngine:
+    """Per-command, per-guild daily request counters with a UTC reset boundary.
+
+    A limit of ``None`` or ``0`` means unlimited; subscribed guilds are always unlimited
+    but are still counted so their usage can be reported.
+    """
+
+    def __init__(self, path=QUOTA_STATE_PATH, reset_hour=QUOTA_RESET_HOUR,
+                 checkpoint=QUOTA_CHECKPOINT_INTERVAL, subscribed=SUBSCRIBED_GUILDS, clock=time.time):
+        self.reset_offset = reset_hour * 3600
+        self.subscribed = subscribed
+        self.clock = clock
+        self.rejections = 0
+        self.store = JsonStore(path, self._load(path), debounce=checkpoint)
+
+    def _period(self, now):
+        return int((now - self.reset_offset) // DAY)
+
+    def _load(self, path):
+        period = self._period(self.clock())
+        data = {"period": period, "counts": {}}
+        if not os.path.exists(path):
+            return data
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stored = loads(f.read())
+        except (json.JSONDecodeError, IOError) as e:
+            log.warning("No se pudo cargar '%s': %s", path, e)
+            return data
+        if stored.get("period") == period:
+            data["counts"] = {
+                command: {int(guild_id): count for guild_id, count in counts.items()}
+                for command, counts in stored.get("counts", {}).items()
+            }
+        return data
+
+    def _counts(self, command):
+        now = self.clock()
+        period = self._period(now)
+        data = self.store.data
+        if period != data["period"]:
+            # Nuevo día: se descarta el diccionario entero en vez de recorrer los servidores.
+            data["period"] = period
+            data["counts"] = {}
+        counts = data["counts"].get(command)
+        if counts is None:
+            counts = data["counts"][command] = {}
+        return counts
+
+    def is_subscribed(self, guild_id):
+        return guild_id in self.subscribed
+
+    def consume(self, command, guild_id, limit):
+        """Count one request and return 0, or return the seconds until the reset if the quota is spent."""
+        counts = self._counts(command)
+        used = counts.get(guild_id, 0)
+        if limit and used >= limit and not self.is_subscribed(guild_id):
+            self.rejections += 1
+            return self.resets_in()
+        counts[guild_id] = used + 1
+        self.store.save()
+        return 0
+
+    def refund(self, command, guild_id):
+        """Give back a request that never reached the upstream API."""
+        counts = self._counts(command)
+        used = counts.get(guild_id, 0)
+        if used > 0:
+            counts[guild_id] = used - 1
+            self.store.save()
+
+    def used(self, command, guild_id):
+        return self._counts(command).get(guild_id, 0)
+
+    def resets_in(self):
+        now = self.clock()
+        return (self._period(now) + 1) * DAY + self.reset_offset - now
+
+    def stats(self):
+        counts = self.store.data["counts"]
+        return {
+            "guilds": {command: len(guilds) for command, guilds in counts.items()},
+            "requests": {command: sum(guilds.values()) for command, guilds in counts.items()},
+            "rejections": self.rejections,
+        }
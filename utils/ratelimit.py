@@ -0,0 +1,143 @@
+import os
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# "host=peticiones/segundos[:ráfaga]" separados por comas, p. ej.
+# "free-fire-like1.p.rapidapi.com=100/60:10,freelike-nx2.vercel.app=30/60".
+# Las peticiones con cabecera x-rapidapi-host gastan del presupuesto de ese host (el plan de RapidAPI).
+UPSTREAM_RATE_LIMITS = os.getenv("UPSTREAM_RATE_LIMITS", "")
+# Con varios procesos (launcher.py) cada uno recibe una parte igual del presupuesto.
+CLUSTER_COUNT = int(os.getenv("CLUSTER_COUNT", 1))
+
+
+def parse_rate_limits(spec, share=1):
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        host, _, rule = item.partition("=")
+        rule, _, burst = rule.partition(":")
+        requests, _, seconds = rule.partition("/")
+        rate = float(requests) / float(seconds or 1)
+        capacity = float(burst or requests)
+        limits[host.strip()] = (rate / share, max(1.0, capacity / share))
+    return limits
+
+
+def parse_retry_after(value, default=30.0):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
+
+
+class TokenBucket:
+    """Token bucket that can also be blocked outright until a Retry-After deadline."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self.blocked_until = 0.0
+
+    def _refill(self, now):
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait(self):
+        """Seconds until a token is available (0 if one is now), without taking it."""
+        now = self.clock()
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.rate is None:
+            return 0.0
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def try_acquire(self):
+        """Take a token and return 0, or return the seconds until one is available."""
+        wait = self.wait()
+        if wait == 0 and self.rate is not None:
+            self.tokens -= 1
+        return wait
+
+    def block(self, seconds):
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+    def remaining(self):
+        self._refill(self.clock())
+        return self.tokens
+
+
+class QuotaGovernor:
+    """One token bucket per upstream host; hosts without a configured rate only honour Retry-After."""
+
+    def __init__(self, limits=None, clock=time.monotonic):
+        self.clock = clock
+        self.limits = parse_rate_limits(UPSTREAM_RATE_LIMITS, CLUSTER_COUNT) if limits is None else limits
+        self._buckets = {}
+        self.rejected = {}
+        self.throttled = {}
+
+    def bucket(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, capacity = self.limits.get(host, (None, 0))
+            bucket = self._buckets[host] = TokenBucket(rate, capacity, self.clock)
+        return bucket
+
+    @staticmethod
+    def budget_host(url, headers=None):
+        """The host whose budget a request spends: the RapidAPI host if set, else the URL's."""
+        if headers and headers.get("x-rapidapi-host"):
+            return headers["x-rapidapi-host"]
+        return urlsplit(url).hostname
+
+    def acquire(self, url, headers=None):
+        host = self.budget_host(url, headers)
+        wait = self.bucket(host).try_acquire()
+        if wait > 0:
+            self.rejected[host] = self.rejected.get(host, 0) + 1
+        return wait
+
+    def wait_for(self, url, headers=None):
+        return self.bucket(self.budget_host(url, headers)).wait()
+
+    def reject(self, urls, headers=None):
+        """Count one local rejection for each budget host of ``urls`` that has no token now."""
+        for host in {self.budget_host(url, headers) for url in urls if self.wait_for(url, headers) > 0}:
+            self.rejected[host] = self.rejected.get(host, 0) + 1
+
+    def blocked_for(self, url, headers=None):
+        bucket = self._buckets.get(self.budget_host(url, headers))
+        if bucket is None:
+            return 0.0
+        return max(0.0, bucket.blocked_until - self.clock())
+
+    def throttle(self, url, retry_after, headers=None):
+        host = self.budget_host(url, headers)
+        self.bucket(host).block(parse_retry_after(retry_after))
+        self.throttled[host] = self.throttled.get(host, 0) + 1
+
+    def stats(self):
+        return {
+            host: {
+                "remaining": bucket.remaining() if bucket.rate is not None else None,
+                "blocked_for": max(0.0, bucket.blocked_until - self.clock()),
+                "rejected": self.rejected.get(host, 0),
+                "throttled": self.throttled.get(host, 0),
+            }
+            for host, bucket in self._buckets.items()
+        }
@@ -0,0 +1,48 @@
+import asyncio
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # opcional: pip install orjson
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:  # opcional: pip install uvloop (no existe en Windows)
+    uvloop = None
+
+# Perfil rápido: uvloop como event loop y orjson para el JSON de las APIs y de la configuración.
+# Lo que no esté instalado se sustituye por la biblioteca estándar.
+FAST_RUNTIME = os.getenv("FAST_RUNTIME", "0") == "1"
+
+_orjson = orjson if FAST_RUNTIME else None
+
+
+def loads(data):
+    """Decode JSON from ``str`` or ``bytes``; errors are ``json.JSONDecodeError`` either way."""
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value):
+    """Compact JSON of ``value`` as ``bytes`` (orjson) or ``str`` (stdlib); ``loads`` accepts both."""
+    if _orjson is not None:
+        # Como json.dumps, las claves int (UIDs, IDs de servidor) se escriben como texto.
+        return _orjson.dumps(value, option=_orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def install_event_loop():
+    """Make ``asyncio.run`` use uvloop when the fast profile is on and uvloop is installed."""
+    if FAST_RUNTIME and uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+def runtime_profile():
+    return {
+        "fast_runtime": FAST_RUNTIME,
+        "event_loop": "uvloop" if FAST_RUNTIME and uvloop is not None else "asyncio",
+        "json": "orjson" if _orjson is not None else "json",
+    }
@@ -0,0 +1,46 @@
+import asyncio
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one awaited future."""
+
+    def __init__(self):
+        self._inflight = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    def __len__(self):
+        return len(self._inflight)
+
+    async def do(self, key, factory):
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            future = asyncio.ensure_future(factory())
+            flight = self._inflight[key] = [future, 0]
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        future = flight[0]
+        flight[1] += 1
+        try:
+            # shield: si un llamador se cancela, el resto sigue esperando la misma petición.
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # El último llamador en irse cancela también la petición subyacente.
+            if flight[1] == 1 and not future.done():
+                future.cancel()
+                self.abandoned += 1
+            raise
+        finally:
+            flight[1] -= 1
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+            "in_flight": len(self._inflight),
+        }
@@ -0,0 +1,46 @@
+import hashlib
+import json
+import os
+import sys
+
+TREE_HASH_FILE = os.getenv("TREE_HASH_FILE", ".command_tree.hash")
+FORCE_TREE_SYNC = os.getenv("FORCE_TREE_SYNC", "0") == "1" or "--sync" in sys.argv
+
+
+def command_tree_hash(tree, application_id):
+    """Stable hash of the serialized global app-command tree for this application."""
+    payload = []
+    for command in tree.get_commands():
+        try:
+            payload.append(command.to_dict(tree))
+        except TypeError:
+            # discord.py < 2.4: to_dict() no recibe el árbol.
+            payload.append(command.to_dict())
+    payload.sort(key=lambda command: command["name"])
+    serialized = json.dumps({"application_id": application_id, "commands": payload}, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def stored_tree_hash(path=TREE_HASH_FILE):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def store_tree_hash(digest, path=TREE_HASH_FILE):
+    temp_file = path + ".tmp"
+    with open(temp_file, "w") as f:
+        f.write(digest)
+    os.replace(temp_file, path)
+
+
+async def sync_if_changed(tree, application_id, force=FORCE_TREE_SYNC):
+    """Call ``tree.sync()`` only when the command tree changed; returns True if it synced."""
+    digest = command_tree_hash(tree, application_id)
+    if not force and digest == stored_tree_hash():
+        return False
+    await tree.sync()
+    store_tree_hash(digest)
+    return True
@@ -0,0 +1,88 @@
+import os
+
+from aiohttp import web
+
+from utils.memory import MEMORY_TRACE
+from utils.metrics import metrics
+from utils.tracing import TRACE_SLOWEST, tracer
+
+STATUS_HOST = os.environ.get("STATUS_HOST", "0.0.0.0")
+STATUS_PORT = int(os.environ.get("PORT", 10000))
+
+
+class StatusServer:
+    """Health, readiness and metrics endpoints served on the bot's own event loop."""
+
+    def __init__(self, bot, host=STATUS_HOST, port=STATUS_PORT):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    def checks(self):
+        bot = self.bot
+        return {
+            "gateway": bot.is_ready() and not bot.is_closed(),
+            "cogs": all(ext in bot.extensions for ext in bot.required_extensions),
+            "upstream": not any(stats["state"] == "open" for stats in bot.upstream.breaker_stats().values()),
+        }
+
+    async def home(self, request):
+        return web.Response(text=f"Bot {self.bot.user or 'None'} is active")
+
+    async def live(self, request):
+        # Si este handler responde, el loop está vivo.
+        return web.json_response({"status": "ok"})
+
+    async def ready(self, request):
+        checks = self.checks()
+        ready = all(checks.values())
+        return web.json_response({
+            "ready": ready,
+            "checks": checks,
+            "cluster": self.bot.cluster_id,
+            "shards": sorted(self.bot.shards),
+            "guilds": len(self.bot.guilds),
+            "latency": self.bot.latency,
+        }, status=200 if ready else 503)
+
+    async def metrics(self, request):
+        return web.Response(
+            body=metrics.render().encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    async def slow(self, request):
+        limit = int(request.query.get("limit", TRACE_SLOWEST))
+        return web.json_response({
+            "buffered": len(tracer.finished),
+            "loop_blocks": self.bot.loop_blocks.blocks,
+            "max_loop_block_ms": round(self.bot.loop_blocks.max_block * 1000, 2),
+            "slowest": tracer.slowest(limit, request.query.get("command")),
+        })
+
+    async def memory(self, request):
+        limit = int(request.query.get("limit", 25))
+        diff = await self.bot.memory.snapshot_diff(limit)
+        if diff is None:
+            return web.Response(status=404, text="tracemalloc no está activo (MEMORY_TRACE=1)")
+        return web.Response(text=diff)
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/", self.home)
+        app.router.add_get("/healthz", self.live)
+        app.router.add_get("/readyz", self.ready)
+        app.router.add_get("/metrics", self.metrics)
+        app.router.add_get("/debug/slow", self.slow)
+        if MEMORY_TRACE:
+            app.router.add_get("/debug/memory", self.memory)
+        # Sin access log: una ráfaga de health checks no debe escribir en stdout desde el loop.
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port, backlog=256).start()
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
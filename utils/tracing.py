@@ -0,0 +1,194 @@
+import asyncio
+import contextvars
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from utils.metrics import loop_blocks
+
+log = logging.getLogger(__name__)
+
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", 512))
+TRACE_SLOWEST = int(os.getenv("TRACE_SLOWEST", 20))
+# Bloqueos del loop más largos que esto (segundos) se registran con la pila que los causó; 0 lo desactiva.
+LOOP_BLOCK_THRESHOLD = float(os.getenv("LOOP_BLOCK_THRESHOLD", 0.25))
+
+_current = contextvars.ContextVar("trace", default=None)
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ("trace", "name", "started")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.add(self.name, self.started, time.perf_counter())
+        return False
+
+
+class Trace:
+    """Timings of one command invocation: a list of ``(phase, offset, duration)`` spans."""
+
+    __slots__ = ("command", "key", "started", "wall_started", "duration", "outcome", "spans")
+
+    def __init__(self, command, key=None):
+        self.command = command
+        self.key = key
+        self.started = time.perf_counter()
+        self.wall_started = time.time()
+        self.duration = None
+        self.outcome = None
+        self.spans = []
+
+    def span(self, name):
+        return _Span(self, name)
+
+    def add(self, name, started, ended):
+        """Record a phase timed by the caller with ``time.perf_counter()``; ignored once finished."""
+        # Una petición compartida (single-flight) puede acabar después de que su primer llamador
+        # haya respondido; la traza ya está en el buffer y no debe cambiar.
+        if self.duration is not None:
+            return
+        self.spans.append((name, started - self.started, ended - started))
+
+    def to_dict(self):
+        return {
+            "command": self.command,
+            "key": self.key,
+            "started": self.wall_started,
+            "duration_ms": round(self.duration * 1000, 2) if self.duration is not None else None,
+            "outcome": self.outcome,
+            "spans": [
+                {"name": name, "offset_ms": round(offset * 1000, 2), "duration_ms": round(duration * 1000, 2)}
+                for name, offset, duration in sorted(self.spans, key=lambda span: span[1])
+            ],
+        }
+
+
+class Tracer:
+    """Keeps the last ``size`` finished traces in a ring buffer."""
+
+    def __init__(self, size=TRACE_BUFFER_SIZE):
+        self.finished = deque(maxlen=size)
+
+    def start(self, command):
+        """Begin a trace for the current task; tasks it creates later record into it too."""
+        trace = Trace(command)
+        _current.set(trace)
+        return trace
+
+    def finish(self, trace, outcome):
+        if trace.duration is not None:
+            return
+        trace.duration = time.perf_counter() - trace.started
+        trace.outcome = outcome
+        self.finished.append(trace)
+
+    @staticmethod
+    def current():
+        return _current.get()
+
+    @staticmethod
+    def span(name):
+        """Time a phase of the current trace; a no-op outside a traced command."""
+        trace = _current.get()
+        return trace.span(name) if trace is not None else NO_SPAN
+
+    @staticmethod
+    def record(name, started):
+        """Record a phase of the current trace that began at ``started`` (perf_counter) and ends now."""
+        trace = _current.get()
+        if trace is not None:
+            trace.add(name, started, time.perf_counter())
+
+    @staticmethod
+    def tag(key):
+        trace = _current.get()
+        if trace is not None:
+            trace.key = key
+
+    def slowest(self, limit=TRACE_SLOWEST, command=None):
+        traces = [trace for trace in self.finished if command is None or trace.command == command]
+        traces.sort(key=lambda trace: trace.duration, reverse=True)
+        return [trace.to_dict() for trace in traces[:limit]]
+
+
+class LoopBlockDetector:
+    """Reports whatever keeps the event loop from running for longer than ``threshold``.
+
+    A heartbeat task stamps the time on every loop turn; a watchdog thread notices a
+    stale stamp and captures the loop thread's stack while it is still blocked.
+    """
+
+    def __init__(self, threshold=LOOP_BLOCK_THRESHOLD):
+        self.threshold = threshold
+        self.blocks = 0
+        self.max_block = 0.0
+        self._beat = time.monotonic()
+        self._stack = None
+        self._loop_thread = None
+        self._task = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        if self.threshold <= 0:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.ensure_future(self._heartbeat())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    async def _heartbeat(self):
+        interval = self.threshold / 4
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            blocked = now - self._beat - interval
+            self._beat = now
+            if blocked > self.threshold:
+                self._report(blocked)
+
+    def _watch(self):
+        interval = self.threshold / 4
+        while not self._stopped.wait(interval):
+            if self._stack is None and time.monotonic() - self._beat > self.threshold:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    self._stack = "".join(traceback.format_stack(frame, limit=12))
+
+    def _report(self, blocked):
+        self.blocks += 1
+        self.max_block = max(self.max_block, blocked)
+        loop_blocks.inc()
+        stack, self._stack = self._stack, None
+        log.warning("Event loop blocked for %.0f ms\n%s", blocked * 1000, (stack or "").rstrip(),
+                    extra={"latency_ms": round(blocked * 1000, 1)})
+
+    def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+
+
+tracer = Tracer()